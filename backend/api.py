@@ -2,30 +2,64 @@ from fastapi import FastAPI, HTTPException, Security, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import APIKeyHeader
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 from contextlib import asynccontextmanager
 import os
 import asyncio
+import importlib
+import time
 import tracemalloc
 import psutil
 import httpx
 from dotenv import load_dotenv
 
-from scrapers.analyze_company import analyze_company, research_founders, research_hype, research_competitors
-from scrapers.models import Company, FounderList, Founder, SocialMedia, Hype, CompetitorList
-
+# Load .env before the scrapers read their settings at import time
 load_dotenv()
 
-# Start memory tracking
-tracemalloc.start()
+from scrapers.analyze_company import analyze_company, research_founders, research_hype, research_competitors, indexed_founders  # noqa: E402
+from scrapers.browsers import close_browsers  # noqa: E402
+from scrapers.cloud_tasks import cloud_tasks  # noqa: E402
+from scrapers.llm_router import llm_router  # noqa: E402
+from scrapers.models import Company, FounderList, Founder, SocialMedia, Hype, CompetitorList  # noqa: E402
+from scheduler import scheduler, deadline_from  # noqa: E402
+from memory_watchdog import watchdog, memory_status  # noqa: E402
+from hedging import hedger  # noqa: E402
+
+# Memory tracking slows down every allocation, so it's opt-in
+if os.getenv("TRACEMALLOC", "false").lower() == "true":
+    tracemalloc.start()
+
+# Load browser_use and the SDK in the background at startup instead of on import
+PREWARM = os.getenv("PREWARM", "true").lower() == "true"
+ready = asyncio.Event()
+
+async def prewarm():
+    started = time.perf_counter()
+    try:
+        for module in ("browser_use", "browser_use_sdk"):
+            await asyncio.to_thread(importlib.import_module, module)
+        cloud_tasks.client  # builds the SDK client
+        print(f"🔥 Prewarm finished in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        # Heavy modules will just load on first use instead
+        print(f"⚠️ Prewarm failed: {e}")
+    finally:
+        ready.set()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    prewarm_task = asyncio.create_task(prewarm()) if PREWARM else None
+    if not PREWARM:
+        ready.set()
+    watchdog_task = asyncio.create_task(watchdog.run())
     yield
     # Shutdown
+    watchdog_task.cancel()
+    if prewarm_task and not prewarm_task.done():
+        prewarm_task.cancel()
     print("Shutting down and cleaning up browser sessions...")
-    # Add any cleanup logic here if needed
+    await close_browsers()
 
 app = FastAPI(
     title="VC Use API",
@@ -56,12 +90,18 @@ async def verify_api_key(api_key: str = Security(api_key_header)):
     return api_key
 
 # Request/Response Models
-class CompanyAnalysisRequest(BaseModel):
+class JobOptions(BaseModel):
+    # "interactive" jobs take browser sessions first, "bulk" refreshes yield to them
+    priority: Literal["interactive", "bulk"] = "interactive"
+    # Give up if the job can't get a browser session within this many seconds
+    deadline_seconds: Optional[float] = None
+
+class CompanyAnalysisRequest(JobOptions):
     company_name: str
     debug: Optional[bool] = False
     callback_url: Optional[str] = None
 
-class FounderResearchRequest(BaseModel):
+class FounderResearchRequest(JobOptions):
     company_name: str
     founders: FounderList
     company_bio: Optional[str] = None
@@ -95,7 +135,7 @@ class DeepResearchResponse(BaseModel):
     competitors: Optional[CompetitorList] = None
     error: Optional[str] = None
 
-class CompetitorResearchRequest(BaseModel):
+class CompetitorResearchRequest(JobOptions):
     company_name: str
 
 class CompetitorResearchResponse(BaseModel):
@@ -103,6 +143,26 @@ class CompetitorResearchResponse(BaseModel):
     data: Optional[CompetitorList] = None
     error: Optional[str] = None
 
+async def run_stage(request: JobOptions, deadline: Optional[float], stage, *args):
+    """
+    Run one scraper stage inside a scheduler slot, releasing its browser before the slot is freed.
+    Slow stages may be hedged with a second attempt (see hedging.py).
+    """
+    await watchdog.admit(request.priority, deadline)
+    async with scheduler.slot(request.priority, deadline):
+        return await hedger.run(stage.__name__, lambda: stage(*args))
+
+async def run_founders_stage(request: FounderResearchRequest, deadline: Optional[float]):
+    """
+    research_founders via run_stage, except that founders fully served from the
+    founder index skip admission and the scheduler - they never open a browser.
+    """
+    founders = indexed_founders(request.company_name, request.founders, request.company_website)
+    if founders is not None:
+        print(f"📇 All founders of {request.company_name} served from the founder index")
+        return founders
+    return await run_stage(request, deadline, research_founders, request.company_name, request.founders, request.company_website)
+
 # Health check endpoint
 @app.get("/")
 async def root():
@@ -112,6 +172,13 @@ async def root():
         "status": "operational"
     }
 
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: only reports ready once the startup prewarm has finished."""
+    if not ready.is_set():
+        raise HTTPException(status_code=503, detail="Prewarming")
+    return {"status": "ready"}
+
 @app.get("/health")
 async def health():
     # Get process memory info
@@ -121,9 +188,11 @@ async def health():
     # Get system memory info
     system_memory = psutil.virtual_memory()
 
-    # Get top memory consumers from tracemalloc
-    snapshot = tracemalloc.take_snapshot()
-    top_stats = snapshot.statistics('lineno')[:10]
+    # Get top memory consumers from tracemalloc (only when TRACEMALLOC=true)
+    top_stats = []
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot()
+        top_stats = snapshot.statistics('lineno')[:10]
 
     top_consumers = [
         {
@@ -141,21 +210,21 @@ async def health():
 
     # Determine status based on memory usage
     memory_percent = process.memory_percent()
-    status = "healthy"
-    if memory_percent > 80:
-        status = "critical"
-    elif memory_percent > 60:
-        status = "degraded"
+    status = memory_status(memory_percent)
 
     response = {
         "status": status,
+        "ready": ready.is_set(),
         "memory": {
             "rss_mb": rss_mb,
             "vms_mb": vms_mb,
             "percent": round(memory_percent, 2),
             "system_available_mb": system_available_mb
         },
-        "top_memory_consumers": top_consumers
+        "top_memory_consumers": top_consumers,
+        "scheduler": scheduler.stats(),
+        "watchdog": watchdog.stats(),
+        "llm": llm_router.stats()
     }
 
     # Log memory stats so they appear in Render logs
@@ -192,8 +261,7 @@ async def api_analyze_company(
     Note: Use /api/full-analysis for parallel company + hype research
     """
     try:
-        company, browser = await analyze_company(request.company_name)
-        await browser.stop()
+        company = await run_stage(request, deadline_from(request.deadline_seconds), analyze_company, request.company_name)
         return CompanyAnalysisResponse(
             success=True,
             data=company
@@ -218,10 +286,10 @@ async def api_research_founders(
     - Bios
     """
     try:
-        result = await research_founders(request.company_name, request.founders)
+        founders = await run_founders_stage(request, deadline_from(request.deadline_seconds))
         return FounderResearchResponse(
             success=True,
-            data=result
+            data=founders
         )
     except Exception as e:
         return FounderResearchResponse(
@@ -242,8 +310,7 @@ async def api_research_competitor(
     - Brief descriptions
     """
     try:
-        competitors, browser = await research_competitors(request.company_name)
-        await browser.stop()
+        competitors = await run_stage(request, deadline_from(request.deadline_seconds), research_competitors, request.company_name)
         return CompetitorResearchResponse(
             success=True,
             data=competitors
@@ -255,23 +322,18 @@ async def api_research_competitor(
         )
 
 # Background task for full analysis
-async def process_full_analysis_background(request: CompanyAnalysisRequest, api_key: str):
+async def process_full_analysis_background(request: CompanyAnalysisRequest, api_key: str, deadline: Optional[float] = None):
     """Background task that does the actual scraping and sends callback"""
     try:
         print(f"🔄 [Background] Starting full analysis for: {request.company_name}")
 
         # Run analyze_company and research_hype in parallel
-        results = await asyncio.gather(
-            analyze_company(request.company_name),
-            research_hype(request.company_name)
+        # Each stage holds its own scheduler slot and stops its browser when done
+        company, hype = await asyncio.gather(
+            run_stage(request, deadline, analyze_company, request.company_name),
+            run_stage(request, deadline, research_hype, request.company_name)
         )
 
-        (company, browser1), (hype, browser2) = results
-
-        # Stop both browsers after both complete
-        await browser1.stop()
-        await browser2.stop()
-
         print(f"✅ [Background] Completed scraping for: {request.company_name}")
 
         # If callback URL provided, send results there
@@ -336,7 +398,7 @@ async def api_full_analysis(
         )
 
     # Queue background task
-    background_tasks.add_task(process_full_analysis_background, request, api_key)
+    background_tasks.add_task(process_full_analysis_background, request, api_key, deadline_from(request.deadline_seconds))
 
     print(f"📨 Accepted full-analysis request for: {request.company_name}, processing in background...")
 
@@ -348,23 +410,18 @@ async def api_full_analysis(
     )
 
 # Background task for deep research
-async def process_deep_research_background(request: FounderResearchRequest, api_key: str):
+async def process_deep_research_background(request: FounderResearchRequest, api_key: str, deadline: Optional[float] = None):
     """Background task that does the actual deep research and sends callback"""
     try:
         print(f"🔄 [Background] Starting deep research for: {request.company_name}")
 
         # Run research_founders and research_competitors in parallel
-        results = await asyncio.gather(
-            research_founders(request.company_name, request.founders),
-            research_competitors(request.company_name, request.company_bio, request.company_website)
+        # Each stage holds its own scheduler slot and stops its browser when done
+        founders, competitors = await asyncio.gather(
+            run_founders_stage(request, deadline),
+            run_stage(request, deadline, research_competitors, request.company_name, request.company_bio, request.company_website)
         )
 
-        (founders, browser1), (competitors, browser2) = results
-
-        # Stop both browsers after both complete
-        await browser1.stop()
-        await browser2.stop()
-
         print(f"✅ [Background] Completed deep research for: {request.company_name}")
 
         # If callback URL provided, send results there
@@ -401,7 +458,7 @@ async def api_deep_research(
     Returns immediately and processes in background, calling webhook when done.
     """
     # Queue background task
-    background_tasks.add_task(process_deep_research_background, request, api_key)
+    background_tasks.add_task(process_deep_research_background, request, api_key, deadline_from(request.deadline_seconds))
 
     print(f"📨 Accepted deep-research request for: {request.company_name}, processing in background...")
 
@@ -0,0 +1,78 @@
+"""
+Cold-start benchmark for the API.
+
+Each run starts a fresh interpreter and measures how long `import api` takes
+and how much memory it holds, then how long the startup prewarm takes to make
+the instance ready.
+
+Usage (from backend/):
+    python benchmarks/cold_start.py [--runs 5] [--no-prewarm]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Runs inside a fresh interpreter and prints one JSON line of measurements
+PROBE = """
+import asyncio, json, resource, sys, time
+started = time.perf_counter()
+import api
+import_s = time.perf_counter() - started
+
+def peak_rss_mb():
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+import_rss_mb = peak_rss_mb()
+heavy_loaded = "browser_use" in sys.modules
+
+async def warm():
+    started = time.perf_counter()
+    async with api.lifespan(api.app):
+        await api.ready.wait()
+        return time.perf_counter() - started
+
+ready_s = asyncio.run(warm())
+print(json.dumps({
+    "import_s": import_s,
+    "import_rss_mb": import_rss_mb,
+    "heavy_loaded_on_import": heavy_loaded,
+    "ready_s": ready_s,
+    "ready_rss_mb": peak_rss_mb(),
+}))
+"""
+
+
+def run_once(prewarm: bool) -> dict:
+    env = {**os.environ, "PREWARM": "true" if prewarm else "false"}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-prewarm", action="store_true")
+    args = parser.parse_args()
+
+    results = [run_once(not args.no_prewarm) for _ in range(args.runs)]
+
+    print(f"Cold start over {args.runs} runs (prewarm {'off' if args.no_prewarm else 'on'}):")
+    for key in ("import_s", "import_rss_mb", "ready_s", "ready_rss_mb"):
+        values = [r[key] for r in results]
+        print(f"  {key:<14} median {statistics.median(values):8.3f}   max {max(values):8.3f}")
+    print(f"  browser_use loaded on import: {any(r['heavy_loaded_on_import'] for r in results)}")
+
+
+if __name__ == "__main__":
+    main()
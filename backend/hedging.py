@@ -0,0 +1,125 @@
+import asyncio
+import math
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+from memory_watchdog import HEALTHY, watchdog
+from scheduler import scheduler
+from scrapers.analyze_company import agent_runs
+from scrapers.browsers import release_browser, released_on_failure
+from scrapers.store import JsonStore
+
+# Hedging is opt-in: it trades extra browser sessions for tail latency
+HEDGING_ENABLED = os.getenv("HEDGING", "false").lower() == "true"
+# Start a second attempt once a stage runs longer than this percentile of its history
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "90"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "10"))
+HEDGE_WINDOW = 200
+
+
+class StageDurations:
+    """Rolling window of successful stage durations, persisted so the percentiles survive restarts."""
+
+    def __init__(self, store: Optional[JsonStore] = None, window: int = HEDGE_WINDOW):
+        self.store = store or JsonStore("stage_durations.json")
+        self.window = window
+
+    async def record(self, stage: str, seconds: float) -> None:
+        durations = self.store.data.setdefault(stage, [])
+        durations.append(round(seconds, 2))
+        del durations[:-self.window]
+        await self.store.save()
+
+    def percentile(self, stage: str, percentile: float = HEDGE_PERCENTILE) -> Optional[float]:
+        """Nearest-rank percentile, or None until we have enough history to trust it."""
+        durations = sorted(self.store.data.get(stage, []))
+        if len(durations) < HEDGE_MIN_SAMPLES:
+            return None
+        rank = max(math.ceil(percentile / 100 * len(durations)) - 1, 0)
+        return durations[rank]
+
+
+class Hedger:
+    """
+    Runs a stage, starting a backup attempt in a separate browser session if it
+    runs past the learned percentile of its past durations.
+
+    The first attempt to return a valid result wins; the other is cancelled and
+    its browser released. A backup only starts if the scheduler has a free
+    session right now and memory is healthy, so hedging never pushes us over
+    the session cap or delays queued jobs.
+    """
+
+    def __init__(self, durations: Optional[StageDurations] = None, enabled: bool = HEDGING_ENABLED):
+        self.durations = durations or StageDurations()
+        self.enabled = enabled
+
+    async def _attempt(self, run: Callable[[], Awaitable[tuple]]) -> tuple:
+        """Returns (result, browser, seconds, whether an agent actually ran)."""
+        started = time.monotonic()
+        runs = []
+        runs_token = agent_runs.set(runs)
+        try:
+            async with released_on_failure():
+                result, browser = await run()
+        finally:
+            agent_runs.reset(runs_token)
+        return result, browser, time.monotonic() - started, bool(runs)
+
+    async def run(self, stage: str, run: Callable[[], Awaitable[tuple]]):
+        """Run `run()` (a stage returning `(result, browser)`) and return its result, its browser released."""
+        first = asyncio.create_task(self._attempt(run))
+        threshold = self.durations.percentile(stage) if self.enabled else None
+
+        attempts = {first}
+        hedge_slot = False
+        winner = None
+        try:
+            if threshold is not None:
+                await asyncio.wait(attempts, timeout=threshold)
+                if not first.done() and watchdog.status == HEALTHY and scheduler.try_acquire():
+                    hedge_slot = True
+                    print(f"🪁 {stage} exceeded p{HEDGE_PERCENTILE:g} ({threshold:.0f}s), starting a hedged attempt")
+                    attempts.add(asyncio.create_task(self._attempt(run)))
+
+            pending = set(attempts)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None and task.result()[0] is not None:
+                        winner = task
+                        break
+
+            if winner is None:
+                # No attempt produced a result; surface the original attempt's outcome
+                winner = first
+
+            result, browser, seconds, ran_agent = await winner
+            await release_browser(browser)
+            # Cache hits return instantly and would drag the learned percentile towards 0
+            if result is not None and ran_agent:
+                await self.durations.record(stage, seconds)
+            if len(attempts) > 1:
+                print(f"🪁 {stage} won by the {'original' if winner is first else 'hedged'} attempt")
+            return result
+        finally:
+            await self._cancel_losers(attempts, winner)
+            if hedge_slot:
+                scheduler.release()
+
+    async def _cancel_losers(self, attempts: set, winner: Optional[asyncio.Task]) -> None:
+        losers = [task for task in attempts if task is not winner]
+        for task in losers:
+            task.cancel()
+        for task in losers:
+            try:
+                _, browser, _, _ = await task
+            except BaseException:
+                # Cancelled or failed attempts release their own browser
+                continue
+            # Finished too late to win; its browser is still open
+            await release_browser(browser)
+
+
+hedger = Hedger()
@@ -0,0 +1,97 @@
+import asyncio
+import gc
+import os
+import time
+from typing import Optional
+
+import psutil
+
+from scheduler import BULK, DeadlineExceeded, scheduler
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+CRITICAL = "critical"
+
+MEMORY_DEGRADED_PERCENT = float(os.getenv("MEMORY_DEGRADED_PERCENT", "60"))
+MEMORY_CRITICAL_PERCENT = float(os.getenv("MEMORY_CRITICAL_PERCENT", "80"))
+MEMORY_CHECK_SECONDS = float(os.getenv("MEMORY_CHECK_SECONDS", "5"))
+
+
+class LoadShed(Exception):
+    pass
+
+
+def memory_status(percent: float) -> str:
+    if percent > MEMORY_CRITICAL_PERCENT:
+        return CRITICAL
+    if percent > MEMORY_DEGRADED_PERCENT:
+        return DEGRADED
+    return HEALTHY
+
+
+class MemoryWatchdog:
+    """
+    Acts on the process's memory status instead of just reporting it.
+
+    - degraded: bulk jobs are shed, both new ones and ones waiting for a session
+    - critical: admission is paused for everything until memory drops back down,
+      and a GC pass is forced to free dropped agent histories sooner
+    """
+
+    def __init__(self, interval: float = MEMORY_CHECK_SECONDS):
+        self.interval = interval
+        self.percent = 0.0
+        self.status = HEALTHY
+        self._sampled_at = 0.0
+        self._process = psutil.Process()
+
+    def sample(self) -> str:
+        previous = self.status
+        self.percent = self._process.memory_percent()
+        self.status = memory_status(self.percent)
+        self._sampled_at = time.monotonic()
+
+        if self.status != previous:
+            print(f"🧠 Memory status {previous} -> {self.status} ({self.percent:.1f}%)")
+        if self.status in (DEGRADED, CRITICAL):
+            shed = scheduler.shed(BULK, LoadShed(f"Shed bulk job, memory is {self.status}"))
+            if shed:
+                print(f"🧠 Shed {shed} waiting bulk jobs")
+        if self.status == CRITICAL and previous != CRITICAL:
+            gc.collect()
+        return self.status
+
+    def current(self) -> str:
+        if time.monotonic() - self._sampled_at > self.interval:
+            self.sample()
+        return self.status
+
+    async def admit(self, priority: str, deadline: Optional[float] = None) -> None:
+        """Wait until a job may start, or raise LoadShed if it's being shed."""
+        while True:
+            status = self.current()
+            if status != HEALTHY and priority == BULK:
+                raise LoadShed(f"Not accepting bulk jobs while memory is {status}")
+            if status != CRITICAL:
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                raise DeadlineExceeded("Deadline passed while admission was paused for memory")
+            await asyncio.sleep(self.interval)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"⚠️ Memory watchdog check failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "status": self.status,
+            "percent": round(self.percent, 2),
+            "admission": "paused" if self.status == CRITICAL else "bulk_shed" if self.status == DEGRADED else "open",
+        }
+
+
+watchdog = MemoryWatchdog()
@@ -0,0 +1,131 @@
+import asyncio
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = {INTERACTIVE: 0, BULK: 1}
+
+MAX_BROWSER_SESSIONS = int(os.getenv("MAX_BROWSER_SESSIONS", "4"))
+# Bulk work that has waited this long is treated as interactive so it can't starve
+STARVATION_SECONDS = float(os.getenv("SCHEDULER_STARVATION_SECONDS", "120"))
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def deadline_from(seconds: Optional[float]) -> Optional[float]:
+    """Turn a relative deadline from a request into an absolute monotonic time."""
+    return time.monotonic() + seconds if seconds else None
+
+
+@dataclass
+class _Waiter:
+    lane: str
+    deadline: Optional[float]
+    seq: int
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class Scheduler:
+    """
+    Hands out browser session slots across all job types.
+
+    Waiters are served interactive lane first, then earliest deadline, then
+    FIFO. Bulk waiters are promoted to the interactive lane once they've
+    waited `starvation_seconds`, so large refreshes keep moving.
+    """
+
+    def __init__(self, capacity: int = MAX_BROWSER_SESSIONS, starvation_seconds: float = STARVATION_SECONDS):
+        self.capacity = capacity
+        self.starvation_seconds = starvation_seconds
+        self.in_use = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    def _rank(self, waiter: _Waiter, now: float) -> tuple:
+        lane = LANES[waiter.lane]
+        if now - waiter.enqueued_at >= self.starvation_seconds:
+            lane = LANES[INTERACTIVE]
+        deadline = waiter.deadline if waiter.deadline is not None else float("inf")
+        return (lane, deadline, waiter.seq)
+
+    def _wake(self) -> None:
+        while self.in_use < self.capacity and self._waiters:
+            now = time.monotonic()
+            waiter = min(self._waiters, key=lambda w: self._rank(w, now))
+            self._waiters.remove(waiter)
+            if waiter.future.done():
+                continue
+            self.in_use += 1
+            waiter.future.set_result(None)
+
+    async def acquire(self, priority: str = INTERACTIVE, deadline: Optional[float] = None) -> None:
+        if priority not in LANES:
+            raise ValueError(f"Unknown priority lane: {priority}")
+        if deadline is not None and deadline <= time.monotonic():
+            raise DeadlineExceeded("Deadline passed before the job could start")
+
+        if self.in_use < self.capacity and not self._waiters:
+            self.in_use += 1
+            return
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, deadline, next(self._seq), loop.create_future())
+        self._waiters.append(waiter)
+        timeout = deadline - time.monotonic() if deadline is not None else None
+        try:
+            await asyncio.wait_for(waiter.future, timeout)
+        except BaseException as e:
+            granted = waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None
+            if granted:
+                # Granted a slot just as we gave up on it
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise DeadlineExceeded("Deadline passed while waiting for a browser session") from e
+            raise
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now and nobody is queued for it."""
+        if self.in_use < self.capacity and not self._waiters:
+            self.in_use += 1
+            return True
+        return False
+
+    def shed(self, lane: str, error: Exception) -> int:
+        """Fail every job still waiting in `lane`; returns how many were shed."""
+        shed = [w for w in self._waiters if w.lane == lane]
+        for waiter in shed:
+            self._waiters.remove(waiter)
+            if not waiter.future.done():
+                waiter.future.set_exception(error)
+        return len(shed)
+
+    def release(self) -> None:
+        self.in_use -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, priority: str = INTERACTIVE, deadline: Optional[float] = None):
+        await self.acquire(priority, deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        waiting = {lane: 0 for lane in LANES}
+        for waiter in self._waiters:
+            waiting[waiter.lane] += 1
+        return {"capacity": self.capacity, "in_use": self.in_use, "waiting": waiting}
+
+
+scheduler = Scheduler()
@@ -1,26 +1,244 @@
 import asyncio
 import os
-from typing import List
-from dotenv import load_dotenv
+from contextvars import ContextVar
+from typing import List, Optional
 import json
-from browser_use import Agent, Browser, ChatGoogle, Tools
-from browser_use_sdk import BrowserUse
 
 # from models import Company, Founder, FounderList, SocialMedia, Hype  # your Pydantic models from models.py
-from .models import Company, Founder, FounderList, CompetitorList, Competitor, SocialMedia, Hype  # your Pydantic models from models.py
+from .models import Company, Founder, FounderList, CompetitorList, Competitor, SocialMedia, Hype, FieldPatchList  # your Pydantic models from models.py
+from .founder_index import founder_index, affiliations_for, normalize_name
+from .competitor_graph import competitor_graph
+from .browsers import get_browser, release_browser
+from .checkpoints import checkpoints, checkpoint_key, resume_instructions, steps_done
+from .validation import parse_result, missing_fields, apply_patch
+from .cloud_tasks import cloud_tasks, executor_for, AGENT, CLOUD_TASK
+from .llm_router import llm_router
+
+# Agent/cloud-task runs made by the current stage attempt; lets the hedger tell real
+# runs apart from ones served entirely from the founder index or competitor graph
+agent_runs: ContextVar[Optional[List[str]]] = ContextVar("agent_runs", default=None)
+
+def _count_agent_run(stage: str) -> None:
+    runs = agent_runs.get()
+    if runs is not None:
+        runs.append(stage)
+
+# browser_use is imported on first use (or by the API's prewarm) to keep cold starts fast
+
+# How many times a stage's agent is run (resuming from its checkpoint) before giving up
+AGENT_MAX_ATTEMPTS = int(os.getenv("AGENT_MAX_ATTEMPTS", "2"))
+MAX_FACT_CHARS = 500
+
+# Fill empty or malformed fields with one narrow follow-up task instead of rerunning a stage
+BACKFILL_MISSING_FIELDS = os.getenv("BACKFILL_MISSING_FIELDS", "true").lower() == "true"
+BACKFILL_MAX_STEPS = int(os.getenv("BACKFILL_MAX_STEPS", "10"))
+
+FIELD_HINTS = {
+    "company_website": "the official website URL",
+    "company_bio": "a brief biography of the company and its main mission",
+    "company_summary": "a summary of their achievements and what the company has done so far",
+    "social_media.linkedin": "their LinkedIn profile URL",
+    "social_media.X": "their X (Twitter) profile URL",
+    "bio": "a brief bio based on their background and experience",
+    "hype_summary": "a brief report on the hype and funding around the company",
+    "numbers": "actual funding amounts, revenue, valuation or user counts (NOT social media follower counts)",
+    "recent_news": "the most recent news items or announcements",
+    "website": "their official website URL",
+    "description": "what they do, key differentiators, funding or traction, and recent news",
+}
+
+def _step_facts(agent) -> List[str]:
+    """Pull what the agent learned in its last step out of its memory and action results."""
+    facts = []
+    for action_result in getattr(agent.state, "last_result", None) or []:
+        text = getattr(action_result, "long_term_memory", None) or action_result.extracted_content
+        if text and not action_result.error:
+            facts.append(text[:MAX_FACT_CHARS])
+    return facts
+
+def _drop_history(agent, history) -> None:
+    """
+    Release an agent's step history (screenshots, page state) as soon as its
+    final result has been read, rather than when the whole job returns.
+    """
+    for item_list in (getattr(history, "history", None), getattr(getattr(agent.state, "history", None), "history", None)):
+        if isinstance(item_list, list):
+            item_list.clear()
+
+def _step_memory(model_output) -> dict:
+    # Newer browser_use puts these on the output itself, older versions on current_state
+    state = getattr(model_output, "current_state", None) or model_output
+    return {
+        "memory": getattr(state, "memory", None),
+        "next_goal": getattr(state, "next_goal", None),
+    }
+
+async def run_agent(stage: str, company_name: str, task: str, output_model_schema, browser, llm=None,
+                    max_steps: int = 100, raise_on_error: bool = True, **agent_kwargs) -> tuple:
+    """
+    Run a stage's agent and return `(final result or None, browser)`.
+
+    Every step is checkpointed, and a failed or empty run is retried with the
+    facts from the checkpoint injected into the task instead of starting over.
+    A retry after the agent raised runs in a fresh browser, since the error
+    may have been the session dying, so callers must carry on with the
+    browser returned here. If the last attempt still raises, its browser is
+    released and the error re-raised; with `raise_on_error=False` the error
+    is logged and `(None, browser)` returned instead, leaving the browser to
+    the caller.
+
+    Stages configured with the cloud-task executor skip all of this and run
+    as a Browser Use cloud task instead (`browser` is None for those).
+    """
+    _count_agent_run(stage)
+    if executor_for(stage) == CLOUD_TASK:
+        try:
+            return await run_cloud_task(stage, company_name, task, output_model_schema), browser
+        except Exception:
+            if raise_on_error:
+                raise
+            return None, browser
+
+    from browser_use import Agent, Tools
+
+    key = checkpoint_key(stage, company_name)
+    # Routed per call to the fastest healthy model (see llm_router.py)
+    llm = llm or llm_router.for_stage(stage)
+
+    try:
+        for attempt in range(1, AGENT_MAX_ATTEMPTS + 1):
+            checkpoint = checkpoints.load(key)
+            if checkpoint:
+                print(f'♻️ Resuming {stage} for {company_name} from step {steps_done(checkpoint)}')
+
+            agent = None
+
+            async def on_step(browser_state_summary, model_output, step_number):
+                step = {"step": step_number, "url": getattr(browser_state_summary, "url", None), **_step_memory(model_output)}
+                checkpoints.record_step(key, step, _step_facts(agent))
+
+            agent = Agent(
+                task=task + resume_instructions(checkpoint),
+                llm=llm,
+                browser=browser,
+                tools=Tools(),
+                available_file_paths=[],
+                output_model_schema=output_model_schema,
+                register_new_step_callback=on_step,
+                **agent_kwargs
+            )
+
+            try:
+                history = await agent.run(max_steps=max_steps)
+            except Exception as e:
+                print(f'⚠️ {stage} agent failed for {company_name} (attempt {attempt}/{AGENT_MAX_ATTEMPTS}): {e}')
+                if attempt == AGENT_MAX_ATTEMPTS:
+                    if not raise_on_error:
+                        return None, browser
+                    await release_browser(browser)
+                    raise
+                browser = await _replace_browser(browser)
+                continue
+
+            result = history.final_result()
+            _drop_history(agent, history)
+            if result:
+                return result, browser
+            print(f'⚠️ {stage} agent returned no result for {company_name} (attempt {attempt}/{AGENT_MAX_ATTEMPTS})')
+
+        return None, browser
+    finally:
+        # Nothing else can ever resume from this run's checkpoint
+        checkpoints.clear(key)
+
+async def _replace_browser(browser):
+    """Swap a possibly dead browser session for a fresh one."""
+    try:
+        await release_browser(browser)
+    except Exception as e:
+        print(f'⚠️ Failed to release browser: {e}')
+    return await get_browser()
+
+async def run_cloud_task(stage: str, company_name: str, task: str, output_model_schema):
+    for attempt in range(1, AGENT_MAX_ATTEMPTS + 1):
+        try:
+            result = await cloud_tasks.run(task, output_model_schema)
+        except Exception as e:
+            print(f'⚠️ {stage} cloud task failed for {company_name} (attempt {attempt}/{AGENT_MAX_ATTEMPTS}): {e}')
+            if attempt == AGENT_MAX_ATTEMPTS:
+                raise
+            continue
+        if result:
+            return result
+        print(f'⚠️ {stage} cloud task returned no result for {company_name} (attempt {attempt}/{AGENT_MAX_ATTEMPTS})')
+    return None
 
-load_dotenv()
+async def stage_browser(stage: str):
+    """A browser for stages run by a local Agent; cloud-task stages don't need one."""
+    return await get_browser() if executor_for(stage) == AGENT else None
 
-client = BrowserUse(api_key=os.getenv("BROWSER_USE_API_KEY"))
+async def backfill_missing(stage: str, company_name: str, items: list, browser):
+    """
+    Fill empty or malformed fields of Company/Founder/Hype/Competitor results in place.
 
-async def analyze_company(company_name: str) -> tuple:
-    tools = Tools()
-    llm = ChatGoogle(model="gemini-flash-latest")
+    All gaps across `items` go into one narrow follow-up task; fields it still
+    can't find are left as they were. Never raises - a failed backfill just
+    keeps the original result. Returns the browser to carry on with (see run_agent).
+    """
+    gaps = [(item, missing_fields(item)) for item in items]
+    gaps = [(item, fields) for item, fields in gaps if fields]
+    if not BACKFILL_MISSING_FIELDS or not gaps:
+        return browser
+
+    lines = []
+    for item, fields in gaps:
+        subject = getattr(item, "name", company_name)
+        wanted = "; ".join(f'"{field}" ({FIELD_HINTS[field]})' for field in fields)
+        lines.append(f'- For "{subject}": {wanted}')
+    missing_text = "\n            ".join(lines)
+    print(f'🔎 Backfilling {sum(len(f) for _, f in gaps)} missing fields for {stage} of {company_name}')
+
+    task = f"""
+        - Use Google to find a few specific missing pieces of information related to the company {company_name}
+        - Only look for the following, nothing else:
+            {missing_text}
+        - **IMPORTANT**
+            - Use the google search results and the summaries under the links, only click on a link if that is the only way to find the information
+            - Make sure what you find is about the right person or company, not someone else with the same name
+            - If you still cannot find something, use "None" as its value
+        - Return ONLY a JSON object with one patch per requested field, in the following format:
+        {{
+            "patches": [
+                {{
+                    "name": string (exactly as given above),
+                    "field": string (exactly as given above),
+                    "value": string (or "None")
+                }}
+            ]
+        }}
+    """
+
+    result, browser = await run_agent(f"{stage}-backfill", company_name, task, FieldPatchList, browser,
+                                      max_steps=BACKFILL_MAX_STEPS, raise_on_error=False)
+    if not result:
+        return browser
+    try:
+        patches = parse_result(result, FieldPatchList)
+    except Exception as e:
+        print(f'⚠️ Backfill failed for {stage} of {company_name}: {e}')
+        return browser
+
+    by_subject = {normalize_name(getattr(item, "name", company_name)): item for item, _ in gaps}
+    filled = 0
+    for patch in patches:
+        item = by_subject.get(normalize_name(patch.name))
+        if item is not None and apply_patch(item, patch.field, patch.value):
+            filled += 1
+    print(f'🔎 Backfill filled {filled} fields for {stage} of {company_name}')
+    return browser
 
-    browser = Browser(
-        use_cloud=True,
-        keep_alive=True
-    )
+async def analyze_company(company_name: str) -> tuple:
+    browser = await stage_browser("company")
 
     # IMPORTANT: match the keys to your Company model (company_website, not official_website)
     task = f"""
@@ -53,20 +271,10 @@ async def analyze_company(company_name: str) -> tuple:
     }}
     """
 
-    agent = Agent(
-        task=task,
-        llm=llm,
-        browser=browser,
-        tools=tools,
-        available_file_paths=[],
-        output_model_schema=Company,
-    )
-
-    history = await agent.run()
-
-    result = history.final_result()
+    result, browser = await run_agent("company", company_name, task, Company, browser)
     if result:
-        parsed: Company = Company.model_validate_json(result)
+        parsed: Company = parse_result(result, Company)
+        browser = await backfill_missing("company", company_name, [parsed], browser)
 
         for founder in parsed.founders_info:
             print('\n--------------------------------')
@@ -77,10 +285,28 @@ async def analyze_company(company_name: str) -> tuple:
         return parsed, browser
     else:
         print('No result')
+        await release_browser(browser)
         raise Exception("Failed to analyze company")
 
-async def research_founders(company_name: str, founders: FounderList) -> dict:
-    founder_names = [f.name for f in founders]
+def indexed_founders(company_name: str, founders: FounderList, company_website: str = None):
+    """The full founder list if every founder is fresh in the index, else None."""
+    known, pending = founder_index.split(founders, affiliations_for(company_name, company_website))
+    if pending:
+        return None
+    return _merge_founders(founders, known)
+
+async def research_founders(company_name: str, founders: FounderList, company_website: str = None) -> tuple:
+    # Serve founders we've already verified for this company from the index,
+    # and only send unknown or stale ones to the agent
+    affiliations = affiliations_for(company_name, company_website)
+    known, pending = founder_index.split(founders, affiliations)
+    for founder in known:
+        print(f'📇 Founder index hit: {founder.name}')
+
+    if not pending:
+        return _merge_founders(founders, known), None
+
+    founder_names = [f.name for f in pending]
 
     task = f"""
         - Use Google to research and provide detailed information about the founders of {company_name}
@@ -111,40 +337,12 @@ async def research_founders(company_name: str, founders: FounderList) -> dict:
         }}
     """
 
-    # task = client.tasks.create_task(
-    #     task=task,
-    #     llm="gemini-flash-latest",
-    #     schema=FounderList,  # browser_use_sdk can validate to this schema
-    # )
-
-    # print(f"Task ID: {task.id}")
-
-    # result = task.complete()
-    # return result.output
-
-    tools = Tools()
-    llm = ChatGoogle(model="gemini-flash-latest")
+    browser = await stage_browser("founders")
 
-    browser = Browser(
-        use_cloud=True,
-        keep_alive=True
-    )
-
-    agent = Agent(
-        task=task,
-        llm=llm,
-        browser=browser,
-        tools=tools,
-        available_file_paths=[],
-        output_model_schema=FounderList,
-        channel='chrome'
-    )
-
-    history = await agent.run()
-
-    result = history.final_result()
+    result, browser = await run_agent("founders", company_name, task, FounderList, browser, channel='chrome')
     if result:
-        parsed: FounderList = FounderList.model_validate_json(result)
+        parsed: FounderList = parse_result(result, FounderList)
+        browser = await backfill_missing("founders", company_name, parsed.founders, browser)
 
         for founder in parsed:
             print('\n--------------------------------')
@@ -152,10 +350,44 @@ async def research_founders(company_name: str, founders: FounderList) -> dict:
             print(f'Social Media:      {founder.social_media}')
             print(f'Personal Website:  {founder.personal_website}')
             print(f'Bio:              {founder.bio}')
-        return parsed, browser
+
+        # Index under the requested names, which is what later lookups use
+        researched = _merge_founders(FounderList(founders=pending), parsed.founders).founders
+        await founder_index.record(researched, affiliations)
+        return _merge_founders(founders, known + researched), browser
     else:
         print('No result')
-        return founders
+        return _merge_founders(founders, known), browser
+
+def _same_founder(requested: str, researched: str, loose: bool) -> bool:
+    a, b = normalize_name(requested).split(), normalize_name(researched).split()
+    if loose:
+        # "Kevin Gu" vs "Kevin J. Gu": same first and last name
+        return bool(a and b) and (a[0], a[-1]) == (b[0], b[-1])
+    return a == b
+
+def _merge_founders(requested: FounderList, researched: List[Founder]) -> FounderList:
+    """
+    Keep the requested founders and their order, each filled in with its
+    researched profile (under the requested name). Researched founders that
+    match none of the requested ones are dropped, since the agent was only
+    asked about these.
+    """
+    requested = list(requested)
+    if not requested:
+        return FounderList(founders=list(researched))
+
+    unmatched = list(researched)
+    merged = list(requested)
+    for loose in (False, True):
+        for i, founder in enumerate(requested):
+            if merged[i] is not founder:
+                continue
+            match = next((r for r in unmatched if _same_founder(founder.name, r.name, loose)), None)
+            if match is not None:
+                unmatched.remove(match)
+                merged[i] = match.model_copy(update={"name": founder.name})
+    return FounderList(founders=merged)
 
 async def research_hype(company_name: str) -> tuple:
     task = f"""
@@ -183,26 +415,12 @@ async def research_hype(company_name: str) -> tuple:
         }}
     """
 
-    tools = Tools()
-    llm = ChatGoogle(model="gemini-flash-latest")
+    browser = await stage_browser("hype")
 
-    browser = Browser(use_cloud=True, keep_alive=True)
-
-    agent = Agent(
-        task=task,
-        llm=llm,
-        browser=browser,
-        tools=tools,
-        available_file_paths=[],
-        output_model_schema=Hype,
-        channel='chrome'
-    )
-
-    history = await agent.run()
-
-    result = history.final_result()
+    result, browser = await run_agent("hype", company_name, task, Hype, browser, channel='chrome')
     if result:
-        parsed: Hype = Hype.model_validate_json(result)
+        parsed: Hype = parse_result(result, Hype)
+        browser = await backfill_missing("hype", company_name, [parsed], browser)
         print('\n--------------------------------')
         print(f'Hype Summary: {parsed.hype_summary}')
         print(f'Numbers: {parsed.numbers}')
@@ -210,6 +428,7 @@ async def research_hype(company_name: str) -> tuple:
         return parsed, browser
     else:
         print('No result')
+        await release_browser(browser)
         raise Exception("Failed to research hype")
 
 async def research_competitors(company_name: str, company_bio: str = None, company_website: str = None) -> tuple:
@@ -228,11 +447,16 @@ async def research_competitors(company_name: str, company_bio: str = None, compa
         search_strategies.append(f'Search for startups/companies that do similar things by querying variations like: "startups similar to [key terms from bio]", "alternatives to [key product/service]", "competitors in [industry/space]"')
     search_strategies.append(f'Search for "{company_name} competitors"')
     search_strategies.append(f'Search for "{company_name} alternatives"')
+    # Seed discovery with competitors earlier jobs already linked to this company
+    known_competitors = competitor_graph.competitors_of(company_name, company_website)
+    if known_competitors:
+        search_strategies.append(f'Competitors found before: {", ".join(known_competitors)}. Check they are still relevant and include them if so, then look for any others')
 
     search_strategy_text = "\n            ".join([f"{i+1}. {s}" for i, s in enumerate(search_strategies)])
 
+    # Step 1: discovery only - find who the competitors are
     task = f"""
-        - You are researching competitors for the following company:
+        - You are finding competitors for the following company:
         {context}
 
         - **SEARCH STRATEGY** - Use these approaches in order to find the most relevant competitors:
@@ -242,7 +466,48 @@ async def research_competitors(company_name: str, company_bio: str = None, compa
         - Identify the top 5 most relevant direct competitors that operate in the same space
 
         - **IMPORTANT**
-            - For EACH competitor you find, do thorough research with multiple targeted searches:
+            - Only identify the competitors and their official websites, do NOT research each competitor in depth
+            - Use the google search results and summaries, do not click on links
+            - Create todos for each action you will take
+
+        - Return ONLY a JSON object where each item matches this schema exactly:
+        {{
+            "competitors": [
+                {{
+                    "name": string,
+                    "website": string (or "None"),
+                    "description": "None"
+                }}
+            ]
+        }}
+    """
+
+    browser = await stage_browser("competitors")
+
+    result, browser = await run_agent("competitors", company_name, task, CompetitorList, browser, channel='chrome')
+    if not result:
+        print('No result')
+        await release_browser(browser)
+        raise Exception("Failed to find competitors")
+
+    discovered: CompetitorList = parse_result(result, CompetitorList)
+
+    # Step 2: detailed research, skipped for competitors the graph already knows
+    fresh, pending = competitor_graph.split(discovered.competitors)
+    for competitor in fresh:
+        print(f'🕸️ Competitor graph hit: {competitor.name}')
+
+    researched = []
+    if pending:
+        competitor_text = "\n            ".join(
+            f"- {c.name} (website: {c.website or 'None'})" for c in pending
+        )
+        task = f"""
+        - You are researching the following competitors of {company_name}:
+            {competitor_text}
+
+        - **IMPORTANT**
+            - For EACH competitor, do thorough research with multiple targeted searches:
                 1. Search for "[competitor name] startup" to find their official website
                 2. Search for "[competitor name] funding raised" to find funding information
                 3. Search for "[competitor name] product features" to understand what they offer
@@ -267,38 +532,26 @@ async def research_competitors(company_name: str, company_bio: str = None, compa
                 }}
             ]
         }}
-    """
-
-    tools = Tools()
-    llm = ChatGoogle(model="gemini-flash-latest")
-
-    browser = Browser(use_cloud=True, keep_alive=True)
-
-    agent = Agent(
-        task=task,
-        llm=llm,
-        browser=browser,
-        tools=tools,
-        available_file_paths=[],
-        output_model_schema=CompetitorList,
-        channel='chrome'
-    )
-
-    history = await agent.run()
-
-    result = history.final_result()
-    if result:
-        parsed: CompetitorList = CompetitorList.model_validate_json(result)
-        print('\n--------------------------------')
-        for competitor in parsed:
-            print(f'Competitor: {competitor.name}')
-            print(f'Website: {competitor.website}')
-            print(f'Description: {competitor.description}')
-            print('--------------------------------')
-        return parsed, browser
-    else:
-        print('No result')
-        raise Exception("Failed to find competitors")
+        """
+
+        result, browser = await run_agent("competitors-detail", company_name, task, CompetitorList, browser, channel='chrome')
+        if result:
+            researched = parse_result(result, CompetitorList).competitors
+            browser = await backfill_missing("competitors", company_name, researched, browser)
+        else:
+            print('No result for competitor details, keeping discovery results')
+            researched = pending
+
+    await competitor_graph.record(company_name, company_website, discovered.competitors, researched)
+
+    parsed = CompetitorList(competitors=fresh + researched)
+    print('\n--------------------------------')
+    for competitor in parsed:
+        print(f'Competitor: {competitor.name}')
+        print(f'Website: {competitor.website}')
+        print(f'Description: {competitor.description}')
+        print('--------------------------------')
+    return parsed, browser
 
 async def main():
     # company_name = "ThirdLayer"
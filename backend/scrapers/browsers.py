@@ -0,0 +1,278 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+if TYPE_CHECKING:
+    from browser_use import Browser
+
+# "cloud" provisions a Browser Use cloud session per stage,
+# "local" leases pooled local headless Chromium processes, one per concurrent stage
+BROWSER_BACKEND = os.getenv("BROWSER_BACKEND", "cloud")
+# Recycle a local Chromium process after this many leases to bound its memory
+LOCAL_BROWSER_MAX_USES = int(os.getenv("LOCAL_BROWSER_MAX_USES", "20"))
+# Keep at most this many local Chromium processes around between leases, each for at most this long
+LOCAL_BROWSER_MAX_IDLE = int(os.getenv("LOCAL_BROWSER_MAX_IDLE", "2"))
+LOCAL_BROWSER_IDLE_SECONDS = float(os.getenv("LOCAL_BROWSER_IDLE_SECONDS", "300"))
+CHROME_PATH = os.getenv("CHROME_PATH")
+
+# Browsers acquired inside the current `released_on_failure()` block
+_open_browsers: ContextVar[Optional[List["Browser"]]] = ContextVar("open_browsers", default=None)
+
+
+def find_chrome() -> str:
+    if CHROME_PATH:
+        return CHROME_PATH
+    for name in ("chromium", "chromium-browser", "google-chrome", "google-chrome-stable", "chrome"):
+        path = shutil.which(name)
+        if path:
+            return path
+    raise RuntimeError("No local Chromium found, set CHROME_PATH or use BROWSER_BACKEND=cloud")
+
+
+class _ChromeProcess:
+    """One headless Chromium exposing CDP, leased to one browser session at a time."""
+
+    def __init__(self):
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        self.user_data_dir = tempfile.mkdtemp(prefix="vc-use-chrome-")
+        self.cdp_url: Optional[str] = None
+        self.uses = 0
+        self.idle_since = 0.0
+
+    async def start(self) -> None:
+        self.proc = await asyncio.create_subprocess_exec(
+            find_chrome(),
+            "--headless=new",
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self.user_data_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-dev-shm-usage",
+            "about:blank",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+        # Chromium writes the port it picked to DevToolsActivePort once CDP is up
+        port_file = Path(self.user_data_dir) / "DevToolsActivePort"
+        for _ in range(100):
+            if self.proc.returncode is not None:
+                raise RuntimeError("Local Chromium exited during startup")
+            if port_file.exists():
+                port = port_file.read_text().split("\n")[0].strip()
+                if port:
+                    self.cdp_url = f"http://127.0.0.1:{port}"
+                    break
+            await asyncio.sleep(0.1)
+        else:
+            await self.stop()
+            raise RuntimeError("Timed out waiting for local Chromium to start")
+
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            await client.get(f"{self.cdp_url}/json/version")
+        print(f"🧭 Started local Chromium at {self.cdp_url}")
+
+    def is_running(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    async def reset(self) -> None:
+        """
+        Wipe what the last lease left behind so the next one starts clean:
+        every tab is replaced by a single about:blank, and cookies plus the
+        storage of the origins those tabs had open are cleared.
+        """
+        from cdp_use import CDPClient
+
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            version = (await client.get(f"{self.cdp_url}/json/version")).json()
+
+        cdp = CDPClient(version["webSocketDebuggerUrl"])
+        await cdp.start()
+        try:
+            targets = (await cdp.send.Target.getTargets())["targetInfos"]
+            pages = [t for t in targets if t["type"] == "page"]
+            origins = {f"{u.scheme}://{u.netloc}" for u in (urlparse(t["url"]) for t in pages) if u.scheme in ("http", "https")}
+            for origin in origins:
+                await cdp.send.Storage.clearDataForOrigin(params={"origin": origin, "storageTypes": "all"})
+            await cdp.send.Storage.clearCookies()
+
+            await cdp.send.Target.createTarget(params={"url": "about:blank"})
+            for page in pages:
+                await cdp.send.Target.closeTarget(params={"targetId": page["targetId"]})
+        finally:
+            await cdp.stop()
+
+    async def stop(self) -> None:
+        if self.proc and self.proc.returncode is None:
+            self.proc.terminate()
+            try:
+                await asyncio.wait_for(self.proc.wait(), 5)
+            except asyncio.TimeoutError:
+                self.proc.kill()
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+class LocalBrowserPool:
+    """
+    Leases local headless Chromium processes to stages.
+
+    browser_use attaches to an existing page on whatever CDP endpoint it is
+    given, so sessions sharing one process could end up driving the same tab.
+    Each lease therefore gets a process of its own: concurrent stages never
+    share tabs, cookies or storage. A returned process is reset (see
+    `_ChromeProcess.reset`) and kept idle for the next lease, skipping the
+    launch, until it has served `max_uses` leases. At most `max_idle`
+    processes are kept, and one left idle for `idle_seconds` is stopped.
+    """
+
+    def __init__(
+        self,
+        max_uses: int = LOCAL_BROWSER_MAX_USES,
+        max_idle: int = LOCAL_BROWSER_MAX_IDLE,
+        idle_seconds: float = LOCAL_BROWSER_IDLE_SECONDS
+    ):
+        self.max_uses = max_uses
+        self.max_idle = max_idle
+        self.idle_seconds = idle_seconds
+        self._idle: List[_ChromeProcess] = []
+        self._leases: Dict[int, _ChromeProcess] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+    async def _launch(self) -> _ChromeProcess:
+        process = _ChromeProcess()
+        try:
+            await process.start()
+        except BaseException:
+            # Don't leave a dead process (or its temp profile) behind
+            await process.stop()
+            raise
+        return process
+
+    async def acquire(self) -> "Browser":
+        from browser_use import Browser
+
+        process = None
+        while self._idle and process is None:
+            candidate = self._idle.pop()
+            if candidate.is_running():
+                process = candidate
+            else:
+                await candidate.stop()
+        if process is None:
+            process = await self._launch()
+        process.uses += 1
+
+        browser = Browser(cdp_url=process.cdp_url, keep_alive=True)
+        self._leases[id(browser)] = process
+        return browser
+
+    async def release(self, browser: "Browser") -> None:
+        process = self._leases.pop(id(browser), None)
+        try:
+            # Only disconnects the session, the process is stopped or reused below
+            await browser.stop()
+        finally:
+            if process:
+                await self._return(process)
+
+    async def _return(self, process: _ChromeProcess) -> None:
+        if process.uses >= self.max_uses or len(self._idle) >= self.max_idle or not process.is_running():
+            await process.stop()
+            return
+        try:
+            await process.reset()
+        except Exception as e:
+            # A process we can't wipe must not serve another stage
+            print(f"⚠️ Could not reset local Chromium, stopping it: {e}")
+            await process.stop()
+            return
+
+        process.idle_since = time.monotonic()
+        self._idle.append(process)
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap())
+
+    async def _reap(self) -> None:
+        """Stop processes that have sat idle too long; runs while any are idle."""
+        while self._idle:
+            await asyncio.sleep(self.idle_seconds / 2)
+            cutoff = time.monotonic() - self.idle_seconds
+            expired = [p for p in self._idle if p.idle_since <= cutoff]
+            self._idle = [p for p in self._idle if p.idle_since > cutoff]
+            for process in expired:
+                await process.stop()
+
+    async def close(self) -> None:
+        if self._reaper:
+            self._reaper.cancel()
+        for process in list(self._leases.values()) + self._idle:
+            await process.stop()
+        self._leases.clear()
+        self._idle.clear()
+
+
+local_pool = LocalBrowserPool()
+
+
+async def get_browser() -> "Browser":
+    """Create the browser session a stage runs in, using the configured backend."""
+    if BROWSER_BACKEND == "local":
+        browser = await local_pool.acquire()
+    else:
+        from browser_use import Browser
+
+        browser = Browser(use_cloud=True, keep_alive=True)
+
+    open_browsers = _open_browsers.get()
+    if open_browsers is not None:
+        open_browsers.append(browser)
+    return browser
+
+
+async def release_browser(browser: Optional["Browser"]) -> None:
+    if browser is None:
+        return
+    open_browsers = _open_browsers.get()
+    if open_browsers is not None:
+        open_browsers[:] = [b for b in open_browsers if b is not browser]
+    if BROWSER_BACKEND == "local":
+        await local_pool.release(browser)
+    else:
+        await browser.stop()
+
+
+@asynccontextmanager
+async def released_on_failure():
+    """
+    Release every browser acquired inside the block if it raises or is cancelled.
+
+    Stages hand their browser back to the caller on success, but a stage that
+    gets cancelled mid-run (e.g. the losing attempt of a hedged stage) would
+    otherwise leak its session.
+    """
+    open_browsers = []
+    token = _open_browsers.set(open_browsers)
+    try:
+        yield
+    except BaseException:
+        for browser in list(open_browsers):
+            try:
+                await release_browser(browser)
+            except Exception as e:
+                print(f"⚠️ Failed to release browser: {e}")
+        raise
+    finally:
+        _open_browsers.reset(token)
+
+
+async def close_browsers() -> None:
+    await local_pool.close()
@@ -0,0 +1,74 @@
+import os
+import uuid
+from typing import Dict, List, Optional
+
+from .founder_index import normalize_name
+from .store import is_missing, utcnow
+
+# Cap what a single run can keep around; the most recent entries win
+CHECKPOINT_MAX_STEPS = int(os.getenv("CHECKPOINT_MAX_STEPS", "30"))
+CHECKPOINT_MAX_FACTS = int(os.getenv("CHECKPOINT_MAX_FACTS", "40"))
+
+
+def checkpoint_key(stage: str, company_name: str) -> str:
+    """
+    Key for one agent run's checkpoint. Every run gets its own: retries inside
+    the run resume from it, while concurrent runs (a hedge racing the original)
+    and later jobs for the same company never see it.
+    """
+    return f"{stage}:{normalize_name(company_name)}:{uuid.uuid4().hex[:12]}"
+
+
+class CheckpointStore:
+    """
+    Per-step progress of agent runs, so a retry can pick up where a failed attempt stopped.
+
+    A checkpoint keeps a compact step history (url, goal, memory) and the
+    facts extracted so far - never screenshots or full page state. It only
+    lives as long as the run that owns it, which clears it when it's done.
+    """
+
+    def __init__(self):
+        self._checkpoints: Dict[str, dict] = {}
+
+    def load(self, key: str) -> Optional[dict]:
+        return self._checkpoints.get(key)
+
+    def record_step(self, key: str, step: dict, facts: List[str]) -> dict:
+        checkpoint = self._checkpoints.setdefault(key, {"steps": [], "facts": [], "updated_at": None})
+        checkpoint["steps"].append(step)
+        for fact in facts:
+            if not is_missing(fact) and fact not in checkpoint["facts"]:
+                checkpoint["facts"].append(fact)
+        checkpoint["steps"] = checkpoint["steps"][-CHECKPOINT_MAX_STEPS:]
+        checkpoint["facts"] = checkpoint["facts"][-CHECKPOINT_MAX_FACTS:]
+        checkpoint["updated_at"] = utcnow().isoformat()
+        return checkpoint
+
+    def clear(self, key: str) -> None:
+        self._checkpoints.pop(key, None)
+
+
+def steps_done(checkpoint: dict) -> int:
+    steps = checkpoint["steps"]
+    return steps[-1]["step"] if steps else 0
+
+
+def resume_instructions(checkpoint: Optional[dict]) -> str:
+    """Task addendum telling a retried agent what the previous attempt already found."""
+    if not checkpoint or not (checkpoint["steps"] or checkpoint["facts"]):
+        return ""
+
+    facts = "\n            ".join(f"- {fact}" for fact in checkpoint["facts"]) or "- None yet"
+    last_step = checkpoint["steps"][-1] if checkpoint["steps"] else {}
+    return f"""
+        - **RESUMING** a previous attempt that stopped after {steps_done(checkpoint)} steps
+            - Do NOT redo searches or research that is already covered by the facts below
+            - Facts already established:
+            {facts}
+            - Last progress note: {last_step.get("memory") or "None"}
+            - Planned next step: {last_step.get("next_goal") or "None"}
+    """
+
+
+checkpoints = CheckpointStore()
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+from typing import TYPE_CHECKING, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from browser_use_sdk import AsyncBrowserUse
+
+# Stage executors: "agent" runs a local browser_use Agent, "cloud-task"
+# submits the stage to Browser Use cloud as an SDK task and polls it
+AGENT = "agent"
+CLOUD_TASK = "cloud-task"
+STAGE_EXECUTOR = os.getenv("STAGE_EXECUTOR", AGENT)
+
+# Point this at a local mock of the task API for testing
+BROWSER_USE_API_URL = os.getenv("BROWSER_USE_API_URL")
+CLOUD_TASK_LLM = os.getenv("CLOUD_TASK_LLM", "gemini-flash-latest")
+CLOUD_TASK_POLL_SECONDS = float(os.getenv("CLOUD_TASK_POLL_SECONDS", "2"))
+CLOUD_TASK_TIMEOUT_SECONDS = float(os.getenv("CLOUD_TASK_TIMEOUT_SECONDS", "900"))
+# Give up on a task after this many consecutive failed status checks
+CLOUD_TASK_MAX_POLL_ERRORS = 5
+
+
+def executor_for(stage: str) -> str:
+    """
+    Executor for a stage, e.g. STAGE_EXECUTOR_HYPE=cloud-task overrides STAGE_EXECUTOR.
+
+    Sub-stages ("competitors-detail", "hype-backfill") follow their parent stage.
+    """
+    base = stage.split("-")[0]
+    return os.getenv(f"STAGE_EXECUTOR_{base.upper()}", STAGE_EXECUTOR)
+
+
+class CloudTaskFailed(Exception):
+    pass
+
+
+class _PendingTask:
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.poll_errors = 0
+
+
+class CloudTaskPoller:
+    """
+    Runs stages as Browser Use cloud tasks.
+
+    One background loop polls every in-flight task ID concurrently, so any
+    number of stages can wait on cloud tasks without blocking the event loop
+    or each running its own polling loop.
+    """
+
+    def __init__(self, poll_seconds: float = CLOUD_TASK_POLL_SECONDS, timeout_seconds: float = CLOUD_TASK_TIMEOUT_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.timeout_seconds = timeout_seconds
+        self._client: Optional["AsyncBrowserUse"] = None
+        self._pending: Dict[str, _PendingTask] = {}
+        self._poll_loop: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> "AsyncBrowserUse":
+        """Built on first use so importing this module doesn't pull in the SDK."""
+        if self._client is None:
+            from browser_use_sdk import AsyncBrowserUse
+
+            kwargs = {"base_url": BROWSER_USE_API_URL} if BROWSER_USE_API_URL else {}
+            self._client = AsyncBrowserUse(api_key=os.getenv("BROWSER_USE_API_KEY"), **kwargs)
+        return self._client
+
+    async def run(self, task: str, schema: Type[BaseModel], llm: str = CLOUD_TASK_LLM) -> Optional[str]:
+        """Submit a task and wait for its output (a JSON string matching `schema`)."""
+        created = await self.client.tasks.create_task(task=task, llm=llm, schema=schema)
+        print(f"☁️ Submitted cloud task {created.id}")
+
+        pending = _PendingTask(asyncio.get_running_loop().create_future())
+        self._pending[created.id] = pending
+        if self._poll_loop is None or self._poll_loop.done():
+            self._poll_loop = asyncio.create_task(self._poll())
+
+        try:
+            return await asyncio.wait_for(pending.future, self.timeout_seconds)
+        except asyncio.TimeoutError:
+            await self._stop(created.id)
+            raise CloudTaskFailed(f"Cloud task {created.id} timed out after {self.timeout_seconds:.0f}s") from None
+        except asyncio.CancelledError:
+            await self._stop(created.id)
+            raise
+        finally:
+            self._pending.pop(created.id, None)
+
+    async def _stop(self, task_id: str) -> None:
+        try:
+            await self.client.tasks.update_task(task_id=task_id, action="stop")
+        except Exception as e:
+            print(f"⚠️ Could not stop cloud task {task_id}: {e}")
+
+    async def _get(self, task_id: str):
+        return await self.client.tasks.get_task(task_id=task_id)
+
+    async def _poll(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.poll_seconds)
+            task_ids = [task_id for task_id, p in self._pending.items() if not p.future.done()]
+            views = await asyncio.gather(*(self._get(task_id) for task_id in task_ids), return_exceptions=True)
+            for task_id, view in zip(task_ids, views):
+                pending = self._pending.get(task_id)
+                if pending is None or pending.future.done():
+                    continue
+                try:
+                    self._update(task_id, pending, view)
+                except Exception as e:
+                    # e.g. output that can't be serialized; fail that task, keep polling the rest
+                    if not pending.future.done():
+                        pending.future.set_exception(CloudTaskFailed(f"Bad result from cloud task {task_id}: {e}"))
+
+    def _update(self, task_id: str, pending: _PendingTask, view) -> None:
+        if isinstance(view, BaseException):
+            pending.poll_errors += 1
+            if pending.poll_errors >= CLOUD_TASK_MAX_POLL_ERRORS:
+                pending.future.set_exception(CloudTaskFailed(f"Lost track of cloud task {task_id}: {view}"))
+            return
+        pending.poll_errors = 0
+
+        if view.status == "finished":
+            output = view.output
+            if output is not None and not isinstance(output, str):
+                output = json.dumps(output)
+            pending.future.set_result(output)
+        elif view.status == "stopped":
+            pending.future.set_exception(CloudTaskFailed(f"Cloud task {task_id} was stopped"))
+
+
+cloud_tasks = CloudTaskPoller()
@@ -0,0 +1,100 @@
+import os
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+from .founder_index import company_domain, normalize_name
+from .models import Competitor
+from .store import JsonStore, is_missing, parse_timestamp, utcnow
+
+COMPETITOR_GRAPH_TTL_DAYS = float(os.getenv("COMPETITOR_GRAPH_TTL_DAYS", "14"))
+
+
+class CompetitorGraph:
+    """
+    Companies we've researched as competitors, and who competes with whom.
+
+    Nodes hold the cached `Competitor` description with a research timestamp.
+    Edges are undirected "competes with" links, timestamped when last seen.
+    """
+
+    def __init__(self, store: Optional[JsonStore] = None, ttl_days: float = COMPETITOR_GRAPH_TTL_DAYS):
+        self.store = store or JsonStore("competitor_graph.json", default={"nodes": {}, "edges": {}})
+        self.ttl = timedelta(days=ttl_days)
+
+    @property
+    def nodes(self) -> dict:
+        return self.store.data["nodes"]
+
+    @property
+    def edges(self) -> dict:
+        return self.store.data["edges"]
+
+    def _key(self, name: str, website: Optional[str] = None) -> str:
+        key = normalize_name(name)
+        if key in self.nodes:
+            return key
+        # Agents don't always spell a company the same way, so fall back to its domain
+        domain = company_domain(website)
+        if domain:
+            for node_key, node in self.nodes.items():
+                if node.get("domain") == domain:
+                    return node_key
+        return key
+
+    def lookup(self, name: str, website: Optional[str] = None) -> Optional[Competitor]:
+        """Return the cached competitor if its detailed research is still fresh."""
+        node = self.nodes.get(self._key(name, website))
+        if not node or not node.get("competitor"):
+            return None
+        if utcnow() - parse_timestamp(node.get("researched_at")) > self.ttl:
+            return None
+        return Competitor.model_validate(node["competitor"])
+
+    def split(self, discovered: List[Competitor]) -> Tuple[List[Competitor], List[Competitor]]:
+        """Split discovered competitors into (fresh, needs_research)."""
+        fresh, pending = [], []
+        for competitor in discovered:
+            cached = self.lookup(competitor.name, competitor.website)
+            if cached:
+                fresh.append(cached)
+            else:
+                pending.append(competitor)
+        return fresh, pending
+
+    def competitors_of(self, company_name: str, company_website: Optional[str] = None) -> List[str]:
+        """Names of the companies we've already seen competing with this one."""
+        neighbours = self.edges.get(self._key(company_name, company_website), {})
+        return sorted(self.nodes[key]["name"] for key in neighbours if key in self.nodes)
+
+    def _ensure_node(self, name: str, website: Optional[str] = None) -> str:
+        key = self._key(name, website)
+        node = self.nodes.setdefault(key, {"name": name, "domain": None, "competitor": None, "researched_at": None})
+        node["domain"] = node["domain"] or company_domain(website)
+        return key
+
+    def add_node(self, competitor: Competitor) -> None:
+        key = self._ensure_node(competitor.name, competitor.website)
+        if is_missing(competitor.description):
+            return
+        self.nodes[key]["competitor"] = competitor.model_dump()
+        self.nodes[key]["researched_at"] = utcnow().isoformat()
+
+    def link(self, company_name: str, company_website: Optional[str], competitor: Competitor) -> None:
+        a = self._ensure_node(company_name, company_website)
+        b = self._ensure_node(competitor.name, competitor.website)
+        if a == b:
+            return
+        now = utcnow().isoformat()
+        self.edges.setdefault(a, {})[b] = now
+        self.edges.setdefault(b, {})[a] = now
+
+    async def record(self, company_name: str, company_website: Optional[str],
+                     discovered: List[Competitor], researched: List[Competitor]) -> None:
+        for competitor in researched:
+            self.add_node(competitor)
+        for competitor in discovered:
+            self.link(company_name, company_website, competitor)
+        await self.store.save()
+
+
+competitor_graph = CompetitorGraph()
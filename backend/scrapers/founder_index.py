@@ -0,0 +1,121 @@
+import os
+import re
+from datetime import timedelta
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .models import Founder, FounderList
+from .store import JsonStore, is_missing, parse_timestamp, utcnow
+
+FOUNDER_INDEX_TTL_DAYS = float(os.getenv("FOUNDER_INDEX_TTL_DAYS", "30"))
+# Founders still missing their LinkedIn or X are re-researched sooner, the profile may have turned up
+FOUNDER_INDEX_PARTIAL_TTL_DAYS = float(os.getenv("FOUNDER_INDEX_PARTIAL_TTL_DAYS", "3"))
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", name.lower()).strip()
+
+
+def company_domain(website: Optional[str]) -> Optional[str]:
+    if is_missing(website):
+        return None
+    parsed = urlparse(website if "//" in website else f"//{website}")
+    host = (parsed.hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host or None
+
+
+def affiliations_for(company_name: str, company_website: Optional[str] = None) -> List[str]:
+    """Keys a founder can be matched on: the company name and, if known, its domain."""
+    keys = [f"name:{normalize_name(company_name)}"]
+    domain = company_domain(company_website)
+    if domain:
+        keys.append(f"domain:{domain}")
+    return keys
+
+
+def has_profile(founder: Founder) -> bool:
+    return not (
+        is_missing(founder.social_media.linkedin)
+        and is_missing(founder.social_media.X)
+        and is_missing(founder.bio)
+    )
+
+
+def is_partial(founder: dict) -> bool:
+    social_media = founder.get("social_media") or {}
+    return is_missing(social_media.get("linkedin")) or is_missing(social_media.get("X"))
+
+
+class FounderIndex:
+    """
+    Founders we've already researched, shared across companies.
+
+    Entries are keyed by normalized founder name and matched on company
+    affiliation (name or domain), so a serial founder is served from the
+    index for every company they've been verified against.
+    """
+
+    def __init__(
+        self,
+        store: Optional[JsonStore] = None,
+        ttl_days: float = FOUNDER_INDEX_TTL_DAYS,
+        partial_ttl_days: float = FOUNDER_INDEX_PARTIAL_TTL_DAYS
+    ):
+        self.store = store or JsonStore("founder_index.json")
+        self.ttl = timedelta(days=ttl_days)
+        self.partial_ttl = timedelta(days=min(partial_ttl_days, ttl_days))
+
+    def _entries(self, name: str) -> list:
+        return self.store.data.setdefault(normalize_name(name), [])
+
+    def lookup(self, name: str, affiliations: List[str]) -> Optional[Founder]:
+        """Return the indexed founder if they're affiliated and were verified within the TTL."""
+        now = utcnow()
+        for entry in self.store.data.get(normalize_name(name), []):
+            if not set(entry["affiliations"]) & set(affiliations):
+                continue
+            ttl = self.partial_ttl if is_partial(entry["founder"]) else self.ttl
+            if now - parse_timestamp(entry["verified_at"]) > ttl:
+                continue
+            return Founder.model_validate(entry["founder"])
+        return None
+
+    def split(self, founders: FounderList, affiliations: List[str]) -> Tuple[List[Founder], List[Founder]]:
+        """Split founders into (known, unknown_or_stale)."""
+        known, pending = [], []
+        for founder in founders:
+            cached = self.lookup(founder.name, affiliations)
+            if cached:
+                known.append(cached)
+            else:
+                pending.append(founder)
+        return known, pending
+
+    def upsert(self, founder: Founder, affiliations: List[str]) -> None:
+        """Record a freshly researched founder; merges with an existing entry for the same person."""
+        entries = self._entries(founder.name)
+        linkedin = founder.social_media.linkedin
+        match = None
+        for entry in entries:
+            same_affiliation = set(entry["affiliations"]) & set(affiliations)
+            same_profile = not is_missing(linkedin) and entry["founder"]["social_media"].get("linkedin") == linkedin
+            if same_affiliation or same_profile:
+                match = entry
+                break
+
+        if match is None:
+            match = {"affiliations": [], "founder": None, "verified_at": None}
+            entries.append(match)
+
+        match["founder"] = founder.model_dump()
+        match["affiliations"] = sorted(set(match["affiliations"]) | set(affiliations))
+        match["verified_at"] = utcnow().isoformat()
+
+    async def record(self, founders: List[Founder], affiliations: List[str]) -> None:
+        for founder in founders:
+            if has_profile(founder):
+                self.upsert(founder, affiliations)
+        await self.store.save()
+
+
+founder_index = FounderIndex()
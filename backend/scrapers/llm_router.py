@@ -0,0 +1,259 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Any, List, Optional
+
+# Comma-separated "provider:model[@base_url]" endpoints to route between, e.g.
+# "google:gemini-flash-latest,google:gemini-2.5-flash,openai:gpt-4.1-mini"
+LLM_MODELS = os.getenv("LLM_MODELS", "google:gemini-flash-latest")
+LLM_ROUTER_WINDOW = int(os.getenv("LLM_ROUTER_WINDOW", "50"))
+# Open an endpoint's circuit after this many consecutive errors, for this long
+LLM_CIRCUIT_FAILURES = int(os.getenv("LLM_CIRCUIT_FAILURES", "3"))
+LLM_CIRCUIT_COOLDOWN_SECONDS = float(os.getenv("LLM_CIRCUIT_COOLDOWN_SECONDS", "60"))
+# Endpoints erroring more often than this over the window are only used as a last resort
+LLM_MAX_ERROR_RATE = float(os.getenv("LLM_MAX_ERROR_RATE", "0.5"))
+
+# Status codes worth retrying on another endpoint; any other 4xx is our request's fault
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+RETRYABLE_ERROR_NAMES = ("Timeout", "Connection", "RateLimit", "Unavailable", "Overloaded", "InternalServer")
+
+
+class StubChatModel:
+    """
+    Local stand-in for a chat model, for tests and offline runs (`LLM_MODELS=stub:<responses.json>`).
+
+    Replays canned responses in order (the last one repeats), optionally after
+    a delay or after failing the first `fail_times` calls.
+    """
+
+    _verified_api_keys = True
+
+    def __init__(self, responses: Optional[List[Any]] = None, latency: float = 0.0, fail_times: int = 0, model: str = "stub"):
+        self.model = model
+        self.responses = list(responses or [])
+        self.latency = latency
+        self.fail_times = fail_times
+        self.calls = 0
+
+    @classmethod
+    def from_file(cls, path: str) -> "StubChatModel":
+        responses = []
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                responses = json.load(f)
+        return cls(responses, model=path or "stub")
+
+    @property
+    def provider(self) -> str:
+        return "stub"
+
+    @property
+    def name(self) -> str:
+        return self.model
+
+    @property
+    def model_name(self) -> str:
+        return self.model
+
+    async def ainvoke(self, messages, output_format=None):
+        from browser_use.llm.views import ChatInvokeCompletion
+
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.calls <= self.fail_times:
+            raise ConnectionError(f"Stub model failure {self.calls}/{self.fail_times}")
+        if not self.responses:
+            raise RuntimeError("Stub model has no canned responses")
+
+        response = self.responses[min(self.calls, len(self.responses)) - 1]
+        if output_format is not None:
+            response = output_format.model_validate(response)
+        elif not isinstance(response, str):
+            response = json.dumps(response)
+        return ChatInvokeCompletion(completion=response, usage=None)
+
+
+def build_chat_model(spec: str):
+    """Build a browser_use chat model from "provider:model[@base_url]"."""
+    provider, _, model = spec.partition(":")
+    model, _, base_url = model.partition("@")
+    kwargs = {"base_url": base_url} if base_url else {}
+
+    if provider == "stub":
+        return StubChatModel.from_file(model)
+    if provider == "google":
+        from browser_use import ChatGoogle
+        return ChatGoogle(model=model, **kwargs)
+    if provider == "openai":
+        from browser_use import ChatOpenAI
+        return ChatOpenAI(model=model, **kwargs)
+    if provider == "anthropic":
+        from browser_use import ChatAnthropic
+        return ChatAnthropic(model=model, **kwargs)
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether an LLM error is the endpoint's fault (transport, timeout, 5xx, rate limit).
+
+    Anything else - a bad request, an overflowing context, a schema the output
+    doesn't match - would fail the same way on every endpoint.
+    """
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status >= 500 or status in RETRYABLE_STATUS_CODES
+    return any(name in type(error).__name__ for name in RETRYABLE_ERROR_NAMES)
+
+
+class ModelEndpoint:
+    """Rolling latency/error stats and a circuit breaker for one model endpoint."""
+
+    def __init__(self, spec: str, llm=None, window: int = LLM_ROUTER_WINDOW):
+        self.spec = spec
+        self._llm = llm
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.last_failure_at = 0.0
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            self._llm = build_chat_model(self.spec)
+        return self._llm
+
+    @property
+    def latency(self) -> float:
+        # Untried endpoints sort first so they get measured
+        return sorted(self.latencies)[len(self.latencies) // 2] if self.latencies else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def is_degraded(self) -> bool:
+        # A bad error rate stops counting against an endpoint once it's had a quiet cooldown,
+        # otherwise an endpoint that's been deprioritized would never be tried again
+        recent = time.monotonic() - self.last_failure_at < LLM_CIRCUIT_COOLDOWN_SECONDS
+        return recent and self.error_rate > LLM_MAX_ERROR_RATE
+
+    def is_open(self) -> bool:
+        # Past the cooldown the circuit is half-open: the next call is a trial
+        return time.monotonic() < self.open_until
+
+    def record_success(self, seconds: float) -> None:
+        self.latencies.append(seconds)
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self) -> None:
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        self.last_failure_at = time.monotonic()
+        if self.consecutive_failures >= LLM_CIRCUIT_FAILURES:
+            self.open_until = time.monotonic() + LLM_CIRCUIT_COOLDOWN_SECONDS
+            print(f"🔌 Circuit opened for {self.spec} after {self.consecutive_failures} errors")
+
+    def stats(self) -> dict:
+        return {
+            "latency_p50_s": round(self.latency, 2),
+            "error_rate": round(self.error_rate, 2),
+            "degraded": self.is_degraded(),
+            "circuit": "open" if self.is_open() else "closed",
+        }
+
+
+class ModelRouter:
+    """
+    Routes every LLM call to the fastest healthy endpoint.
+
+    Endpoints with an open circuit are skipped, endpoints with a high error
+    rate are tried last, and the rest are ordered by median latency.
+    """
+
+    def __init__(self, endpoints: List[ModelEndpoint]):
+        self.endpoints = endpoints
+
+    @classmethod
+    def from_env(cls, specs: str = LLM_MODELS) -> "ModelRouter":
+        endpoints = [ModelEndpoint(spec.strip()) for spec in specs.split(",") if spec.strip()]
+        if not endpoints:
+            raise ValueError("LLM_MODELS must list at least one provider:model endpoint")
+        return cls(endpoints)
+
+    def candidates(self) -> List[ModelEndpoint]:
+        closed = [e for e in self.endpoints if not e.is_open()]
+        ranked = sorted(closed, key=lambda e: (e.is_degraded(), e.latency))
+        # If every circuit is open, try the one that reopens soonest rather than failing outright
+        return ranked or sorted(self.endpoints, key=lambda e: e.open_until)[:1]
+
+    def for_stage(self, stage: str) -> "RoutedChatModel":
+        return RoutedChatModel(self, stage)
+
+    def stats(self) -> dict:
+        return {e.spec: e.stats() for e in self.endpoints}
+
+
+class RoutedChatModel:
+    """
+    A browser_use chat model that picks an endpoint per call.
+
+    Each agent step goes to the router's current best endpoint; if that call
+    hits an endpoint error (see `is_retryable`), the step fails over to the next
+    candidate, so a provider outage mid-run moves the agent to another model
+    instead of killing it. Errors caused by the request itself are raised as-is.
+    """
+
+    _verified_api_keys = True
+
+    def __init__(self, router: ModelRouter, stage: str):
+        self.router = router
+        self.stage = stage
+        self.current = router.candidates()[0]
+
+    @property
+    def model(self) -> str:
+        return self.current.llm.model
+
+    @property
+    def provider(self) -> str:
+        return self.current.llm.provider
+
+    @property
+    def name(self) -> str:
+        return self.current.llm.name
+
+    @property
+    def model_name(self) -> str:
+        return self.current.llm.model
+
+    async def ainvoke(self, messages, output_format=None):
+        last_error = None
+        for endpoint in self.router.candidates():
+            started = time.monotonic()
+            try:
+                result = await endpoint.llm.ainvoke(messages, output_format)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                endpoint.record_failure()
+                last_error = e
+                print(f"⚠️ {self.stage} LLM call to {endpoint.spec} failed, failing over: {e}")
+                continue
+            endpoint.record_success(time.monotonic() - started)
+            self.current = endpoint
+            return result
+        raise last_error
+
+
+llm_router = ModelRouter.from_env()
@@ -84,6 +84,17 @@ class CompetitorList(PrettyBaseModel):
     def __getitem__(self, index) -> Competitor:
         return self.competitors[index]
 
+class FieldPatch(PrettyBaseModel):
+    name: str
+    field: str
+    value: Optional[str] = None
+
+class FieldPatchList(PrettyBaseModel):
+    patches: List[FieldPatch]
+
+    def __iter__(self) -> Iterator[FieldPatch]:
+        return iter(self.patches)
+
 # Example
 if __name__ == "__main__":
     sm = SocialMedia(linkedin="https://linkedin.com/in/example", X="@example")
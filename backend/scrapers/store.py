@@ -0,0 +1,82 @@
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Persistent scraper state (founder index, competitor graph, ...) lives here
+DATA_DIR = Path(os.getenv("DATA_DIR", Path(__file__).parent.parent / "data"))
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def parse_timestamp(value) -> datetime:
+    if not value:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(value)
+
+
+def is_missing(value) -> bool:
+    """Agents write "None" (or "N/A") as a string when they can't find something."""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip().lower() in ("", "none", "null", "n/a", "na", "unknown")
+    return False
+
+
+class JsonStore:
+    """Small JSON file store shared by the scraper caches.
+
+    The whole document is kept in memory and rewritten atomically on save,
+    which is plenty for the few thousand entries we keep per store. Saves
+    write the file off the event loop.
+    """
+
+    def __init__(self, filename: str, default=None):
+        self.path = DATA_DIR / filename
+        self._lock = threading.RLock()
+        self._default = default if default is not None else {}
+        self._data = None
+        self._write_lock = threading.Lock()
+        self._version = 0
+        self._written = 0
+
+    @property
+    def data(self) -> dict:
+        with self._lock:
+            if self._data is None:
+                self._data = self._load()
+            return self._data
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return json.loads(json.dumps(self._default))
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Could not read {self.path}, starting empty: {e}")
+            return json.loads(json.dumps(self._default))
+
+    def _write(self, payload: str, version: int) -> None:
+        with self._write_lock:
+            # Saves can finish out of order; never overwrite a newer snapshot
+            if version <= self._written:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+            self._written = version
+
+    async def save(self) -> None:
+        # Snapshot on the loop so the writer thread never sees the data mid-update
+        self._version += 1
+        version = self._version
+        payload = json.dumps(self.data, indent=2)
+        await asyncio.to_thread(self._write, payload, version)
@@ -0,0 +1,144 @@
+import json
+import re
+from typing import Dict, List, Optional, Type
+from urllib.parse import urlparse
+
+from pydantic import BaseModel, ValidationError
+
+from .models import Company, Competitor, CompetitorList, Founder, FounderList, Hype
+from .store import is_missing
+
+# Fields worth a follow-up query when an agent leaves them empty, per model.
+# Company.founders_info is filled by research_founders, so it isn't listed here.
+CHECKED_FIELDS: Dict[type, List[str]] = {
+    Company: ["company_website", "company_bio", "company_summary"],
+    Founder: ["social_media.linkedin", "social_media.X", "bio"],
+    Hype: ["hype_summary", "numbers", "recent_news"],
+    Competitor: ["website", "description"],
+}
+
+URL_FIELDS = {
+    "company_website": None,
+    "website": None,
+    "social_media.linkedin": ("linkedin.com",),
+    "social_media.X": ("x.com", "twitter.com"),
+}
+
+# Root field to wrap a bare JSON array in, for list models
+LIST_FIELDS = {FounderList: "founders", CompetitorList: "competitors"}
+
+
+def repair_json(text: str) -> str:
+    """
+    Best-effort fix for near-valid JSON from an agent: code fences, extra prose,
+    trailing commas, and output truncated mid-string or mid-object.
+    """
+    text = re.sub(r"^\s*```(?:json)?\s*|\s*```\s*$", "", text.strip())
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if starts:
+        text = text[min(starts):]
+
+    # One pass that knows when it's inside a string, so commas and brackets
+    # in string values are left alone
+    out, stack, in_string, escaped = [], [], False, False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            out.append(char)
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            # Drop a trailing comma before the closer
+            while out and (out[-1].isspace() or out[-1] == ","):
+                out.pop()
+            if stack:
+                stack.pop()
+        out.append(char)
+        if not stack and char in "}]":
+            # The top-level value is complete, anything after it is prose
+            break
+
+    # Truncated output: finish the open string, drop a dangling comma, null out a dangling key
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    while out and (out[-1].isspace() or out[-1] == ","):
+        out.pop()
+    if out and out[-1] == ":":
+        out.append(" null")
+    return "".join(out) + "".join(reversed(stack))
+
+
+def parse_result(result: str, schema: Type[BaseModel]) -> BaseModel:
+    """Validate an agent's final result, repairing the JSON first if it doesn't validate as-is."""
+    try:
+        return schema.model_validate_json(result)
+    except ValidationError as e:
+        original_error = e
+
+    try:
+        data = json.loads(repair_json(result))
+    except json.JSONDecodeError:
+        raise original_error
+
+    if isinstance(data, list) and schema in LIST_FIELDS:
+        data = {LIST_FIELDS[schema]: data}
+    parsed = schema.model_validate(data)
+    print(f'🩹 Repaired malformed {schema.__name__} JSON')
+    return parsed
+
+
+def get_field(model: BaseModel, path: str):
+    value = model
+    for part in path.split("."):
+        value = getattr(value, part, None)
+    return value
+
+
+def set_field(model: BaseModel, path: str, value) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        model = getattr(model, part)
+    setattr(model, last, value)
+
+
+def is_valid_url(value: str, domains: Optional[tuple] = None) -> bool:
+    parsed = urlparse(value if "//" in value else f"https://{value}")
+    host = (parsed.hostname or "").lower()
+    if "." not in host or " " in value.strip():
+        return False
+    return not domains or any(host == d or host.endswith("." + d) for d in domains)
+
+
+def is_bad_value(path: str, value) -> bool:
+    if is_missing(value):
+        return True
+    if path == "social_media.X" and re.fullmatch(r"@\w{1,15}", str(value).strip()):
+        return False
+    if path in URL_FIELDS:
+        return not is_valid_url(str(value), URL_FIELDS[path])
+    return False
+
+
+def missing_fields(model: BaseModel) -> List[str]:
+    """Checked fields of a Company/Founder/Hype/Competitor that are empty or malformed."""
+    return [path for path in CHECKED_FIELDS.get(type(model), []) if is_bad_value(path, get_field(model, path))]
+
+
+def apply_patch(target: BaseModel, path: str, value) -> bool:
+    """Fill one gap from a follow-up result, unless the new value is no better."""
+    if path not in CHECKED_FIELDS.get(type(target), []) or is_bad_value(path, value):
+        return False
+    set_field(target, path, value)
+    return True
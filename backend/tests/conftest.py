@@ -0,0 +1,14 @@
+import pytest
+
+from scrapers.store import JsonStore
+
+
+@pytest.fixture
+def json_store(tmp_path):
+    """Build JsonStores that read and write under the test's temp dir instead of DATA_DIR."""
+    def build(filename: str, default=None) -> JsonStore:
+        store = JsonStore(filename, default=default)
+        store.path = tmp_path / filename
+        return store
+
+    return build
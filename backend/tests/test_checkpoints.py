@@ -0,0 +1,122 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from scrapers import analyze_company
+from scrapers.checkpoints import (CHECKPOINT_MAX_FACTS, CHECKPOINT_MAX_STEPS, CheckpointStore, checkpoint_key,
+                                  resume_instructions, steps_done)
+
+
+def test_every_run_gets_its_own_key():
+    key = checkpoint_key("hype", "Acme, Inc.")
+    assert key.startswith("hype:acme inc:")
+    assert checkpoint_key("hype", "Acme, Inc.") != key
+
+
+def test_record_step_dedupes_facts_and_caps_history():
+    store = CheckpointStore()
+    steps = max(CHECKPOINT_MAX_STEPS, CHECKPOINT_MAX_FACTS) + 5
+    for step in range(1, steps + 1):
+        store.record_step("k", {"step": step}, ["same fact", "None", f"fact {step}"])
+
+    checkpoint = store.load("k")
+    assert len(checkpoint["steps"]) == CHECKPOINT_MAX_STEPS
+    assert steps_done(checkpoint) == steps
+    assert len(checkpoint["facts"]) == CHECKPOINT_MAX_FACTS
+    assert "None" not in checkpoint["facts"]
+    assert checkpoint["facts"][-1] == f"fact {steps}"
+
+    store.clear("k")
+    assert store.load("k") is None
+
+
+def test_resume_instructions_carry_facts_and_last_step():
+    assert resume_instructions(None) == ""
+
+    store = CheckpointStore()
+    checkpoint = store.record_step("k", {"step": 7, "memory": "found the site", "next_goal": "find funding"}, ["Raised $5M"])
+    text = resume_instructions(checkpoint)
+    assert "after 7 steps" in text
+    assert "- Raised $5M" in text
+    assert "found the site" in text and "find funding" in text
+
+
+class FakeAgent:
+    """Stands in for browser_use.Agent: records one step, then follows the test's script."""
+
+    script = []
+    runs = []
+
+    def __init__(self, task, browser, register_new_step_callback, **kwargs):
+        self.task = task
+        self.browser = browser
+        self.on_step = register_new_step_callback
+        self.state = SimpleNamespace(last_result=[SimpleNamespace(long_term_memory=None, extracted_content="a fact", error=None)])
+
+    async def run(self, max_steps):
+        FakeAgent.runs.append(self)
+        await self.on_step(SimpleNamespace(url="https://example.com"), SimpleNamespace(memory="m", next_goal="g"), len(FakeAgent.runs))
+        outcome = FakeAgent.script.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(final_result=lambda: outcome, history=[])
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    FakeAgent.script, FakeAgent.runs = [], []
+    monkeypatch.setitem(sys.modules, "browser_use", SimpleNamespace(Agent=FakeAgent, Tools=lambda: None))
+    monkeypatch.setattr(analyze_company, "checkpoints", CheckpointStore())
+    browsers = SimpleNamespace(launched=0, released=[])
+
+    async def get_browser():
+        browsers.launched += 1
+        return f"browser-{browsers.launched}"
+
+    async def release_browser(browser):
+        browsers.released.append(browser)
+
+    monkeypatch.setattr(analyze_company, "get_browser", get_browser)
+    monkeypatch.setattr(analyze_company, "release_browser", release_browser)
+    return browsers
+
+
+async def test_retry_resumes_in_a_fresh_browser_and_clears_the_checkpoint(agent):
+    FakeAgent.script = [RuntimeError("session died"), '{"ok": true}']
+
+    result, browser = await analyze_company.run_agent("hype", "Acme", "task", None, "browser-0", llm=object())
+
+    assert result == '{"ok": true}'
+    assert [run.browser for run in FakeAgent.runs] == ["browser-0", "browser-1"]
+    assert browser == "browser-1"
+    assert agent.released == ["browser-0"]
+    assert "RESUMING" in FakeAgent.runs[1].task and "- a fact" in FakeAgent.runs[1].task
+    assert analyze_company.checkpoints._checkpoints == {}
+
+
+async def test_giving_up_releases_the_browser_and_clears_the_checkpoint(agent):
+    FakeAgent.script = [RuntimeError("first"), RuntimeError("second")]
+
+    with pytest.raises(RuntimeError, match="second"):
+        await analyze_company.run_agent("hype", "Acme", "task", None, "browser-0", llm=object())
+    assert agent.released == ["browser-0", "browser-1"]
+    assert analyze_company.checkpoints._checkpoints == {}
+
+
+async def test_empty_results_keep_the_browser_and_clear_the_checkpoint(agent):
+    FakeAgent.script = [None, None]
+
+    result, browser = await analyze_company.run_agent("hype", "Acme", "task", None, "browser-0", llm=object())
+    assert (result, browser) == (None, "browser-0")
+    assert agent.released == []
+    assert analyze_company.checkpoints._checkpoints == {}
+
+
+async def test_raise_on_error_false_hands_back_a_live_browser(agent):
+    FakeAgent.script = [RuntimeError("first"), RuntimeError("second")]
+
+    result, browser = await analyze_company.run_agent("hype", "Acme", "task", None, "browser-0", llm=object(),
+                                                      raise_on_error=False)
+    assert (result, browser) == (None, "browser-1")
+    assert agent.released == ["browser-0"]
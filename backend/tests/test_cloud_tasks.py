@@ -0,0 +1,119 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from scrapers.cloud_tasks import CloudTaskFailed, CloudTaskPoller
+
+
+class Output(BaseModel):
+    value: str
+
+
+class FakeTasks:
+    """In-memory stand-in for the SDK's `client.tasks`; tests set each task's status and output."""
+
+    def __init__(self):
+        self.tasks = {}
+        self.stopped = []
+
+    async def create_task(self, task, llm, schema):
+        task_id = f"task-{len(self.tasks)}"
+        self.tasks[task_id] = SimpleNamespace(status="running", output=None)
+        return SimpleNamespace(id=task_id)
+
+    async def get_task(self, task_id):
+        view = self.tasks[task_id]
+        if isinstance(view, Exception):
+            raise view
+        return view
+
+    async def update_task(self, task_id, action):
+        self.stopped.append(task_id)
+        self.tasks[task_id] = SimpleNamespace(status="stopped", output=None)
+
+    def finish(self, task_id, output):
+        self.tasks[task_id] = SimpleNamespace(status="finished", output=output)
+
+
+@pytest.fixture
+def tasks():
+    return FakeTasks()
+
+
+def make_poller(tasks: FakeTasks, timeout_seconds: float = 5) -> CloudTaskPoller:
+    poller = CloudTaskPoller(poll_seconds=0.01, timeout_seconds=timeout_seconds)
+    poller._client = SimpleNamespace(tasks=tasks)
+    return poller
+
+
+async def _submitted(poller: CloudTaskPoller, tasks: FakeTasks) -> tuple:
+    """Start a run and return (its asyncio task, its cloud task ID)."""
+    submitted = len(tasks.tasks)
+    run = asyncio.create_task(poller.run("task", Output))
+    while len(poller._pending) <= submitted:
+        await asyncio.sleep(0)
+    return run, list(tasks.tasks)[-1]
+
+
+async def test_finished_output_is_returned_as_json(tasks):
+    poller = make_poller(tasks)
+    run, task_id = await _submitted(poller, tasks)
+
+    tasks.finish(task_id, {"value": "ok"})
+    assert json.loads(await run) == {"value": "ok"}
+    assert not poller._pending
+
+
+async def test_bad_output_fails_only_its_own_task(tasks):
+    poller = make_poller(tasks)
+    bad, bad_id = await _submitted(poller, tasks)
+    good, good_id = await _submitted(poller, tasks)
+
+    tasks.finish(bad_id, {"value": object()})
+    with pytest.raises(CloudTaskFailed):
+        await bad
+
+    tasks.finish(good_id, '{"value": "ok"}')
+    assert await good == '{"value": "ok"}'
+
+
+async def test_stopped_task_fails(tasks):
+    poller = make_poller(tasks)
+    run, task_id = await _submitted(poller, tasks)
+
+    await tasks.update_task(task_id, "stop")
+    with pytest.raises(CloudTaskFailed):
+        await run
+
+
+async def test_timeout_stops_the_remote_task(tasks):
+    poller = make_poller(tasks, timeout_seconds=0.05)
+    run, task_id = await _submitted(poller, tasks)
+
+    with pytest.raises(CloudTaskFailed, match="timed out"):
+        await run
+    assert tasks.stopped == [task_id]
+    assert not poller._pending
+
+
+async def test_cancelled_run_stops_the_remote_task(tasks):
+    poller = make_poller(tasks)
+    run, task_id = await _submitted(poller, tasks)
+
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+    assert tasks.stopped == [task_id]
+
+
+async def test_gives_up_after_repeated_poll_errors(tasks, monkeypatch):
+    monkeypatch.setattr("scrapers.cloud_tasks.CLOUD_TASK_MAX_POLL_ERRORS", 2)
+    poller = make_poller(tasks)
+    run, task_id = await _submitted(poller, tasks)
+
+    tasks.tasks[task_id] = ConnectionError("unreachable")
+    with pytest.raises(CloudTaskFailed, match="Lost track"):
+        await run
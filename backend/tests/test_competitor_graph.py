@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+import pytest
+
+from scrapers.competitor_graph import CompetitorGraph
+from scrapers.models import Competitor
+from scrapers.store import utcnow
+
+
+@pytest.fixture
+def graph(json_store):
+    return CompetitorGraph(json_store("competitor_graph.json", default={"nodes": {}, "edges": {}}), ttl_days=14)
+
+
+def competitor(name: str, website: str = "None", description: str = "None") -> Competitor:
+    return Competitor(name=name, website=website, description=description)
+
+
+async def test_researched_competitors_are_served_until_stale(graph):
+    foo = competitor("Foo AI", "https://foo.ai", "Builds agents")
+    await graph.record("Acme", "acme.com", [competitor("Foo AI", "https://foo.ai")], [foo])
+
+    fresh, pending = graph.split([competitor("Foo AI"), competitor("Bar Labs")])
+    assert [c.description for c in fresh] == ["Builds agents"]
+    assert [c.name for c in pending] == ["Bar Labs"]
+
+    graph.nodes["foo ai"]["researched_at"] = (utcnow() - timedelta(days=15)).isoformat()
+    fresh, pending = graph.split([competitor("Foo AI")])
+    assert fresh == [] and [c.name for c in pending] == ["Foo AI"]
+
+
+async def test_differently_spelled_competitor_falls_back_to_its_domain(graph):
+    await graph.record("Acme", None, [], [competitor("Foo AI", "https://www.foo.ai", "Builds agents")])
+
+    fresh, pending = graph.split([competitor("Foo.ai Inc", "foo.ai/pricing")])
+    assert [c.description for c in fresh] == ["Builds agents"]
+    assert pending == []
+
+    # Without a matching domain a different name is a different company
+    fresh, pending = graph.split([competitor("Foo.ai Inc", "https://other.com")])
+    assert fresh == [] and len(pending) == 1
+
+
+async def test_discovery_only_competitors_still_need_research(graph):
+    await graph.record("Acme", None, [competitor("Foo AI", "foo.ai")], [competitor("Foo AI", "foo.ai")])
+
+    fresh, pending = graph.split([competitor("Foo AI", "foo.ai")])
+    assert fresh == [] and len(pending) == 1
+
+
+async def test_edges_link_both_ways_and_seed_later_discovery(graph):
+    await graph.record("Acme", "acme.com", [competitor("Foo AI", "foo.ai"), competitor("Bar Labs")], [])
+
+    assert graph.competitors_of("Acme") == ["Bar Labs", "Foo AI"]
+    assert graph.competitors_of("ACME Inc", "https://acme.com") == ["Bar Labs", "Foo AI"]
+    assert graph.competitors_of("Foo AI") == ["Acme"]
+    assert graph.competitors_of("Unknown Co") == []
+
+
+async def test_company_is_never_its_own_competitor(graph):
+    await graph.record("Acme", "acme.com", [competitor("Acme", "https://acme.com")], [])
+    assert graph.competitors_of("Acme") == []
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from scrapers.analyze_company import _merge_founders
+from scrapers.founder_index import FounderIndex, affiliations_for, company_domain, normalize_name
+from scrapers.models import Founder, FounderList, SocialMedia
+from scrapers.store import utcnow
+
+ACME = affiliations_for("Acme, Inc.", "https://www.acme.com/about")
+
+
+def founder(name: str, linkedin: str = "None", x: str = "None", bio: str = "None") -> Founder:
+    return Founder(name=name, social_media=SocialMedia(linkedin=linkedin, X=x, other="None"), personal_website="None", bio=bio)
+
+
+def full(name: str) -> Founder:
+    slug = normalize_name(name).replace(" ", "-")
+    return founder(name, f"https://linkedin.com/in/{slug}", f"https://x.com/{slug}", f"{name} builds things")
+
+
+def age(index: FounderIndex, name: str, days: float) -> None:
+    for entry in index.store.data[normalize_name(name)]:
+        entry["verified_at"] = (utcnow() - timedelta(days=days)).isoformat()
+
+
+def test_affiliations_cover_name_and_domain():
+    assert normalize_name("  Kevin J. Gu ") == "kevin j gu"
+    assert company_domain("www.Acme.com/about") == "acme.com"
+    assert ACME == ["name:acme inc", "domain:acme.com"]
+
+
+async def test_lookup_matches_on_any_shared_affiliation(json_store):
+    index = FounderIndex(json_store("founder_index.json"))
+    await index.record([full("Ada Lovelace")], ACME)
+
+    assert index.lookup("ada lovelace", ["domain:acme.com"]).name == "Ada Lovelace"
+    assert index.lookup("Ada Lovelace", affiliations_for("Acme Inc")) is not None
+    assert index.lookup("Ada Lovelace", affiliations_for("Other Co", "other.com")) is None
+
+
+async def test_serial_founder_is_known_for_every_verified_company(json_store):
+    index = FounderIndex(json_store("founder_index.json"))
+    ada = full("Ada Lovelace")
+    await index.record([ada], ACME)
+    await index.record([ada], affiliations_for("Engines Ltd"))
+
+    # Same LinkedIn profile, so both companies land on one entry
+    assert len(index.store.data["ada lovelace"]) == 1
+    assert index.lookup("Ada Lovelace", affiliations_for("Engines Ltd")) is not None
+    assert index.lookup("Ada Lovelace", ACME) is not None
+
+
+async def test_stale_entries_are_not_served(json_store):
+    index = FounderIndex(json_store("founder_index.json"), ttl_days=30, partial_ttl_days=3)
+    await index.record([full("Ada Lovelace")], ACME)
+
+    age(index, "Ada Lovelace", 29)
+    assert index.lookup("Ada Lovelace", ACME) is not None
+    age(index, "Ada Lovelace", 31)
+    assert index.lookup("Ada Lovelace", ACME) is None
+
+
+async def test_partial_profiles_go_stale_sooner(json_store):
+    index = FounderIndex(json_store("founder_index.json"), ttl_days=30, partial_ttl_days=3)
+    await index.record([founder("Grace Hopper", linkedin="https://linkedin.com/in/grace", bio="Admiral")], ACME)
+
+    age(index, "Grace Hopper", 2)
+    assert index.lookup("Grace Hopper", ACME) is not None
+    age(index, "Grace Hopper", 4)
+    assert index.lookup("Grace Hopper", ACME) is None
+
+
+async def test_empty_profiles_are_not_indexed(json_store):
+    index = FounderIndex(json_store("founder_index.json"))
+    await index.record([founder("Nobody Known")], ACME)
+    assert index.lookup("Nobody Known", ACME) is None
+
+
+async def test_split_and_persistence(json_store):
+    index = FounderIndex(json_store("founder_index.json"))
+    await index.record([full("Ada Lovelace")], ACME)
+
+    known, pending = index.split(FounderList(founders=[founder("Ada Lovelace"), founder("Grace Hopper")]), ACME)
+    assert [f.name for f in known] == ["Ada Lovelace"]
+    assert [f.name for f in pending] == ["Grace Hopper"]
+
+    reloaded = FounderIndex(json_store("founder_index.json"))
+    assert reloaded.lookup("Ada Lovelace", ACME) is not None
+
+
+def test_merge_keeps_requested_founders_and_order():
+    requested = FounderList(founders=[founder("Kevin Gu"), founder("Ann Lee"), founder("Bo Chen")])
+    merged = _merge_founders(requested, [full("ann lee"), full("Kevin J. Gu"), full("Someone Else")])
+
+    assert [f.name for f in merged] == ["Kevin Gu", "Ann Lee", "Bo Chen"]
+    assert merged[0].social_media.linkedin == "https://linkedin.com/in/kevin-j-gu"
+    assert merged[1].bio == "ann lee builds things"
+    assert merged[2].bio == "None"
+
+
+def test_merge_prefers_exact_name_over_loose_match():
+    requested = FounderList(founders=[founder("Kevin Gu"), founder("Kevin J. Gu")])
+    merged = _merge_founders(requested, [full("Kevin J. Gu"), full("Kevin Gu")])
+    assert [f.social_media.linkedin for f in merged] == [
+        "https://linkedin.com/in/kevin-gu",
+        "https://linkedin.com/in/kevin-j-gu",
+    ]
+
+
+def test_merge_without_requested_founders_returns_research():
+    merged = _merge_founders(FounderList(founders=[]), [full("Ada Lovelace")])
+    assert [f.name for f in merged] == ["Ada Lovelace"]
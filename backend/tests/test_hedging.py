@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+import hedging
+from hedging import Hedger, StageDurations
+from scheduler import Scheduler
+from scrapers import browsers
+from scrapers.analyze_company import _count_agent_run
+from scrapers.store import JsonStore
+
+
+class FakeBrowser:
+    def __init__(self, name: str):
+        self.name = name
+        self.stopped = False
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = Scheduler(capacity=4)
+    monkeypatch.setattr(hedging, "scheduler", scheduler)
+    monkeypatch.setattr(hedging.watchdog, "status", hedging.HEALTHY)
+    return scheduler
+
+
+@pytest.fixture
+def launched(monkeypatch):
+    """Route get_browser/release_browser to fake browsers, recorded in launch order."""
+    launched = []
+
+    async def acquire():
+        browser = FakeBrowser(f"browser-{len(launched)}")
+        launched.append(browser)
+        return browser
+
+    monkeypatch.setattr(browsers, "BROWSER_BACKEND", "local")
+    monkeypatch.setattr(browsers.local_pool, "acquire", acquire)
+    return launched
+
+
+def make_hedger(tmp_path, history=None) -> Hedger:
+    store = JsonStore("stage_durations.json")
+    store.path = tmp_path / "stage_durations.json"
+    durations = StageDurations(store)
+    for seconds in history or []:
+        durations.store.data.setdefault("stage", []).append(seconds)
+    return Hedger(durations, enabled=True)
+
+
+def stage_with(delays: list, results: list, ran_agent: bool = True):
+    """A stage whose n-th attempt sleeps delays[n] and returns results[n] in a fresh browser."""
+    calls = []
+
+    async def run():
+        attempt = len(calls)
+        calls.append(attempt)
+        if ran_agent:
+            _count_agent_run("stage")
+        browser = await browsers.get_browser()
+        await asyncio.sleep(delays[attempt])
+        return results[attempt], browser
+
+    return run, calls
+
+
+async def test_fast_stage_runs_once_and_records_its_duration(tmp_path, scheduler, launched):
+    hedger = make_hedger(tmp_path, history=[1.0] * 10)
+    run, calls = stage_with([0.01], ["result"])
+
+    assert await hedger.run("stage", run) == "result"
+    assert calls == [0]
+    assert launched[0].stopped
+    assert len(hedger.durations.store.data["stage"]) == 11
+
+
+async def test_cache_hit_is_not_recorded(tmp_path, scheduler, launched):
+    hedger = make_hedger(tmp_path, history=[1.0] * 10)
+    run, _ = stage_with([0], ["cached"], ran_agent=False)
+
+    assert await hedger.run("stage", run) == "cached"
+    assert len(hedger.durations.store.data["stage"]) == 10
+
+
+async def test_hedged_attempt_wins_and_loser_is_cancelled(tmp_path, scheduler, launched):
+    hedger = make_hedger(tmp_path, history=[0.05] * 10)
+    run, calls = stage_with([5, 0.01], ["original", "hedged"])
+
+    assert await hedger.run("stage", run) == "hedged"
+    assert calls == [0, 1]
+    # Both the winner's browser and the cancelled loser's are released
+    assert [b.stopped for b in launched] == [True, True]
+    assert scheduler.in_use == 0
+
+
+async def test_loser_that_finishes_late_is_released(tmp_path, scheduler, launched):
+    hedger = make_hedger(tmp_path, history=[0.05] * 10)
+    # The original only returns None, so the hedge's result wins even though both finish
+    run, calls = stage_with([0.1, 0.2], [None, "hedged"])
+
+    assert await hedger.run("stage", run) == "hedged"
+    assert [b.stopped for b in launched] == [True, True]
+    assert scheduler.in_use == 0
+
+
+async def test_no_hedge_without_a_free_session(tmp_path, scheduler, launched):
+    hedger = make_hedger(tmp_path, history=[0.05] * 10)
+    for _ in range(scheduler.capacity):
+        scheduler.try_acquire()
+    run, calls = stage_with([0.1], ["original"])
+
+    assert await hedger.run("stage", run) == "original"
+    assert calls == [0]
+    assert scheduler.in_use == scheduler.capacity
+
+
+async def test_no_result_is_not_recorded(tmp_path, scheduler, launched):
+    hedger = make_hedger(tmp_path)
+    run, _ = stage_with([0.01], [None])
+
+    assert await hedger.run("stage", run) is None
+    assert launched[0].stopped
+    assert "stage" not in hedger.durations.store.data
+
+
+async def test_failed_attempt_releases_its_browser(tmp_path, scheduler, launched):
+    hedger = make_hedger(tmp_path)
+
+    async def run():
+        await browsers.get_browser()
+        raise RuntimeError("agent crashed")
+
+    with pytest.raises(RuntimeError):
+        await hedger.run("stage", run)
+    assert launched[0].stopped
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import sys
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+from scrapers import llm_router
+from scrapers.llm_router import ModelEndpoint, ModelRouter, RoutedChatModel, StubChatModel, is_retryable
+
+
+@pytest.fixture(autouse=True)
+def completions(monkeypatch):
+    """StubChatModel returns browser_use completions; stand in for them when browser_use isn't installed."""
+    try:
+        import browser_use.llm.views  # noqa: F401
+    except ImportError:
+        views = ModuleType("browser_use.llm.views")
+        views.ChatInvokeCompletion = lambda completion, usage: SimpleNamespace(completion=completion, usage=usage)
+        monkeypatch.setitem(sys.modules, "browser_use", ModuleType("browser_use"))
+        monkeypatch.setitem(sys.modules, "browser_use.llm", ModuleType("browser_use.llm"))
+        monkeypatch.setitem(sys.modules, "browser_use.llm.views", views)
+
+
+@pytest.fixture(autouse=True)
+def breaker(monkeypatch):
+    monkeypatch.setattr(llm_router, "LLM_CIRCUIT_FAILURES", 2)
+    monkeypatch.setattr(llm_router, "LLM_CIRCUIT_COOLDOWN_SECONDS", 0.1)
+    monkeypatch.setattr(llm_router, "LLM_MAX_ERROR_RATE", 0.3)
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+class Rejecting(StubChatModel):
+    """A model every call to which fails with `error`."""
+
+    def __init__(self, error: Exception, model: str):
+        super().__init__(["unused"], model=model)
+        self.error = error
+
+    async def ainvoke(self, messages, output_format=None):
+        self.calls += 1
+        raise self.error
+
+
+def routed(*llms) -> RoutedChatModel:
+    router = ModelRouter([ModelEndpoint(llm.model, llm) for llm in llms])
+    return RoutedChatModel(router, "stage")
+
+
+async def test_fails_over_on_endpoint_errors():
+    flaky, backup = StubChatModel(["a"], fail_times=1, model="flaky"), StubChatModel(["b"], model="backup")
+    model = routed(flaky, backup)
+
+    assert (await model.ainvoke([])).completion == "b"
+    assert model.current.spec == "backup"
+    assert list(model.router.endpoints[0].outcomes) == [False]
+
+
+async def test_request_errors_are_raised_without_failover():
+    broken, backup = Rejecting(BadRequest("context length exceeded"), "broken"), StubChatModel(["b"], model="backup")
+    model = routed(broken, backup)
+
+    with pytest.raises(BadRequest):
+        await model.ainvoke([])
+    assert backup.calls == 0
+    assert list(model.router.endpoints[0].outcomes) == []
+    assert model.router.endpoints[0].consecutive_failures == 0
+
+
+async def test_raises_the_last_error_when_every_endpoint_fails():
+    model = routed(Rejecting(TimeoutError("slow"), "a"), Rejecting(ConnectionError("down"), "b"))
+    with pytest.raises(ConnectionError):
+        await model.ainvoke([])
+
+
+async def test_circuit_opens_then_half_opens_after_cooldown(monkeypatch):
+    # Keep the error rate from deprioritizing the endpoint, this is about the breaker alone
+    monkeypatch.setattr(llm_router, "LLM_MAX_ERROR_RATE", 1.0)
+    flaky, backup = StubChatModel(["a"], fail_times=2, model="flaky"), StubChatModel(["b"], model="backup")
+    model = routed(flaky, backup)
+    endpoint = model.router.endpoints[0]
+
+    assert (await model.ainvoke([])).completion == "b"
+    assert not endpoint.is_open()
+    assert (await model.ainvoke([])).completion == "b"
+    assert endpoint.is_open()
+    assert [e.spec for e in model.router.candidates()] == ["backup"]
+
+    await model.ainvoke([])
+    assert flaky.calls == 2
+
+    await asyncio.sleep(0.15)
+    # Half-open: the next call is a trial, and its success closes the circuit
+    assert (await model.ainvoke([])).completion == "a"
+    assert endpoint.consecutive_failures == 0 and not endpoint.is_open()
+
+
+async def test_ranks_by_latency_and_degraded_endpoints_last():
+    fast, slow = StubChatModel(["fast"], model="fast"), StubChatModel(["slow"], latency=0.02, model="slow")
+    model = routed(slow, fast)
+    model.router.endpoints[0].record_success(0.02)
+    model.router.endpoints[1].record_success(0.0)
+    assert [e.spec for e in model.router.candidates()] == ["fast", "slow"]
+
+    # One failure in two calls is over the 0.3 error rate: fast becomes a last resort
+    model.router.endpoints[1].record_failure()
+    assert model.router.endpoints[1].is_degraded()
+    assert [e.spec for e in model.router.candidates()] == ["slow", "fast"]
+    assert (await model.ainvoke([])).completion == "slow"
+
+
+def test_all_circuits_open_falls_back_to_the_soonest_reopening():
+    model = routed(StubChatModel(["a"], model="a"), StubChatModel(["b"], model="b"))
+    a, b = model.router.endpoints
+    for _ in range(2):
+        a.record_failure()
+    for _ in range(2):
+        b.record_failure()
+    assert [e.spec for e in model.router.candidates()] == ["a"]
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (TimeoutError(), True),
+    (asyncio.TimeoutError(), True),
+    (ConnectionError(), True),
+    (type("ModelRateLimitError", (Exception,), {})(), True),
+    (type("APIStatusError", (Exception,), {"status_code": 503})(), True),
+    (type("APIStatusError", (Exception,), {"status_code": 429})(), True),
+    (SimpleNamespace(response=SimpleNamespace(status_code=502)), True),
+    (BadRequest(), False),
+    (ValueError("schema mismatch"), False),
+    (RuntimeError("context length exceeded"), False),
+])
+def test_is_retryable(error, retryable):
+    assert is_retryable(error) is retryable
+
+
+async def test_from_env_builds_stub_endpoints(tmp_path):
+    responses = tmp_path / "responses.json"
+    responses.write_text(json.dumps(["first", {"second": True}]))
+    model = RoutedChatModel(ModelRouter.from_env(f"stub:{responses}"), "stage")
+
+    assert (await model.ainvoke([])).completion == "first"
+    assert json.loads((await model.ainvoke([])).completion) == {"second": True}
+    assert (await model.ainvoke([])).completion == '{"second": true}'
+
+
+def test_from_env_requires_an_endpoint():
+    with pytest.raises(ValueError):
+        ModelRouter.from_env(" , ")
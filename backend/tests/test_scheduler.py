@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+
+from scheduler import BULK, INTERACTIVE, DeadlineExceeded, Scheduler, deadline_from
+
+
+async def _waiting(scheduler: Scheduler, order: list, name: str, priority: str, deadline=None) -> asyncio.Task:
+    async def wait():
+        async with scheduler.slot(priority, deadline):
+            order.append(name)
+
+    task = asyncio.create_task(wait())
+    await asyncio.sleep(0)
+    return task
+
+
+async def test_interactive_lane_is_served_before_bulk():
+    scheduler = Scheduler(capacity=1)
+    await scheduler.acquire()
+    order = []
+    bulk = await _waiting(scheduler, order, "bulk", BULK)
+    interactive = await _waiting(scheduler, order, "interactive", INTERACTIVE)
+
+    scheduler.release()
+    await asyncio.gather(bulk, interactive)
+    assert order == ["interactive", "bulk"]
+    assert scheduler.in_use == 0
+
+
+async def test_earlier_deadline_is_served_first_within_a_lane():
+    scheduler = Scheduler(capacity=1)
+    await scheduler.acquire()
+    order = []
+    late = await _waiting(scheduler, order, "late", INTERACTIVE, deadline_from(60))
+    no_deadline = await _waiting(scheduler, order, "none", INTERACTIVE)
+    soon = await _waiting(scheduler, order, "soon", INTERACTIVE, deadline_from(30))
+
+    scheduler.release()
+    await asyncio.gather(late, no_deadline, soon)
+    assert order == ["soon", "late", "none"]
+
+
+async def test_starved_bulk_work_is_promoted():
+    scheduler = Scheduler(capacity=1, starvation_seconds=0)
+    await scheduler.acquire()
+    order = []
+    bulk = await _waiting(scheduler, order, "bulk", BULK)
+    interactive = await _waiting(scheduler, order, "interactive", INTERACTIVE)
+
+    scheduler.release()
+    await asyncio.gather(bulk, interactive)
+    assert order == ["bulk", "interactive"]
+
+
+async def test_deadline_passing_while_queued_raises_and_leaves_the_queue():
+    scheduler = Scheduler(capacity=1)
+    await scheduler.acquire()
+
+    with pytest.raises(DeadlineExceeded):
+        await scheduler.acquire(INTERACTIVE, deadline_from(0.05))
+    assert scheduler.stats()["waiting"] == {INTERACTIVE: 0, BULK: 0}
+
+    scheduler.release()
+    assert scheduler.in_use == 0
+
+
+async def test_past_deadline_is_rejected_without_queueing():
+    scheduler = Scheduler(capacity=1)
+    with pytest.raises(DeadlineExceeded):
+        await scheduler.acquire(INTERACTIVE, time.monotonic() - 1)
+    assert scheduler.in_use == 0
+
+
+async def test_shed_fails_only_the_given_lane():
+    scheduler = Scheduler(capacity=1)
+    await scheduler.acquire()
+    order = []
+    bulk = await _waiting(scheduler, order, "bulk", BULK)
+    interactive = await _waiting(scheduler, order, "interactive", INTERACTIVE)
+
+    assert scheduler.shed(BULK, RuntimeError("shed")) == 1
+    with pytest.raises(RuntimeError):
+        await bulk
+
+    scheduler.release()
+    await interactive
+    assert order == ["interactive"]
+    assert scheduler.in_use == 0
+
+
+async def test_try_acquire_only_takes_a_free_slot_nobody_is_queued_for():
+    scheduler = Scheduler(capacity=2)
+    assert scheduler.try_acquire()
+    assert scheduler.try_acquire()
+    assert not scheduler.try_acquire()
+
+    order = []
+    queued = await _waiting(scheduler, order, "queued", BULK)
+    scheduler.release()
+    # The freed slot went to the queued job, not to a hedge
+    assert not scheduler.try_acquire()
+    await queued
+    scheduler.release()
+    assert scheduler.in_use == 0
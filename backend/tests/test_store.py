@@ -0,0 +1,31 @@
+import asyncio
+import json
+
+
+async def test_save_round_trips(json_store):
+    store = json_store("data.json")
+    store.data["a"] = [1, 2]
+    await store.save()
+
+    assert json.loads(store.path.read_text()) == {"a": [1, 2]}
+    assert json_store("data.json").data == {"a": [1, 2]}
+
+
+async def test_concurrent_saves_keep_the_latest_snapshot(json_store):
+    store = json_store("data.json")
+    saves = []
+    for i in range(10):
+        store.data["n"] = i
+        saves.append(asyncio.create_task(store.save()))
+        # Let the save take its snapshot before the next change
+        await asyncio.sleep(0)
+    await asyncio.gather(*saves)
+    assert json.loads(store.path.read_text()) == {"n": 9}
+
+
+def test_missing_or_corrupt_file_starts_from_default(json_store):
+    assert json_store("missing.json", default={"nodes": {}}).data == {"nodes": {}}
+
+    corrupt = json_store("corrupt.json")
+    corrupt.path.write_text("{not json")
+    assert corrupt.data == {}
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from scrapers.models import CompetitorList, Founder, FounderList, Hype, SocialMedia
+from scrapers.validation import apply_patch, missing_fields, parse_result, repair_json
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Truncated mid-string
+    ('{"hype_summary": "ok", "numbers": "$5M', {"hype_summary": "ok", "numbers": "$5M"}),
+    # Prose after the value, including brackets
+    ('{"a": "b"} trailing {note}', {"a": "b"}),
+    # Prose before the value, code fences
+    ('Here you go:\n```json\n{"a": [1, 2]}\n```', {"a": [1, 2]}),
+    # Trailing commas, but never inside strings
+    ('{"x": "x, ]", "y": [1, 2,], }', {"x": "x, ]", "y": [1, 2]}),
+    ('{"x": "a,}"}', {"x": "a,}"}),
+    # Escaped quotes and brackets inside strings
+    ('{"a": [1, {"b": "c\\"}]"}', {"a": [1, {"b": 'c"}]'}]}),
+    # Unclosed containers
+    ('[{"a": 1}, {"b": 2}', [{"a": 1}, {"b": 2}]),
+    ('{"a": {"b": [1, 2', {"a": {"b": [1, 2]}}),
+    # Truncated after a key, a comma, or an escape
+    ('{"a": "b", "c":', {"a": "b", "c": None}),
+    ('{"a": 1,', {"a": 1}),
+    ('{"a": "tab\\', {"a": "tab"}),
+])
+def test_repair_json(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+@pytest.mark.parametrize("text", ['{"a": 1}', '[1, "two", {"three": [3]}]', '{"s": "{[,]}"}'])
+def test_repair_json_leaves_valid_json_alone(text):
+    assert json.loads(repair_json(text)) == json.loads(text)
+
+
+def test_parse_result_repairs_truncated_output():
+    parsed = parse_result('Result: {"hype_summary": "Hot", "numbers": "$5M seed, ', Hype)
+    assert parsed.hype_summary == "Hot"
+    assert parsed.numbers == "$5M seed,"
+
+
+def test_parse_result_wraps_bare_lists():
+    parsed = parse_result('[{"name": "Foo", "website": "foo.ai", "description": "None"},]', CompetitorList)
+    assert [c.name for c in parsed] == ["Foo"]
+
+
+def test_parse_result_raises_the_original_error_when_unrepairable():
+    with pytest.raises(ValidationError):
+        parse_result("no json here", Hype)
+    with pytest.raises(ValidationError):
+        parse_result('{"numbers": "$5M"}', Hype)
+
+
+def test_missing_fields_and_patches():
+    founder = Founder(name="Ada", social_media=SocialMedia(linkedin="None", X="@ada", other=None), bio="N/A")
+    assert missing_fields(founder) == ["social_media.linkedin", "bio"]
+
+    assert not apply_patch(founder, "social_media.linkedin", "https://example.com/ada")
+    assert apply_patch(founder, "social_media.linkedin", "https://www.linkedin.com/in/ada")
+    assert not apply_patch(founder, "name", "Someone else")
+    assert missing_fields(founder) == ["bio"]
+    assert FounderList(founders=[founder])[0].social_media.linkedin == "https://www.linkedin.com/in/ada"